@@ -5,44 +5,51 @@ from flask_migrate import Migrate
 from dotenv import load_dotenv
 import os
 
+from db_routing import RoutingSession, engine_options, replica_binds
+
 # Load environment variables FIRST
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
    
-    # Get database credentials - FIXED: Use correct environment variable names
-    user = os.getenv('MYSQL_USER')
-    password = os.getenv('MYSQL_PASSWORD')
-    host = os.getenv('MYSQL_HOST', 'localhost')
-    port = os.getenv('MYSQL_PORT', '3306')
-    database = os.getenv('MYSQL_DATABASE')
-   
-    # Debug: Print to verify credentials are loaded
-    print(f"Database config: {user}@{host}:{port}/{database}")
-   
-    if not all([user, password, host, database]):
-        missing_vars = []
-        if not user: missing_vars.append('MYSQL_USER')
-        if not password: missing_vars.append('MYSQL_PASSWORD')
-        if not host: missing_vars.append('MYSQL_HOST')
-        if not database: missing_vars.append('MYSQL_DATABASE')
-        raise ValueError(f"Missing required database environment variables: {', '.join(missing_vars)}")
+    # PRIMARY_DATABASE_URL overrides the MySQL settings (e.g. a local SQLite file)
+    database_url = os.getenv('PRIMARY_DATABASE_URL')
+    
+    if not database_url:
+        # Get database credentials - FIXED: Use correct environment variable names
+        user = os.getenv('MYSQL_USER')
+        password = os.getenv('MYSQL_PASSWORD')
+        host = os.getenv('MYSQL_HOST', 'localhost')
+        port = os.getenv('MYSQL_PORT', '3306')
+        database = os.getenv('MYSQL_DATABASE')
+       
+        # Debug: Print to verify credentials are loaded
+        print(f"Database config: {user}@{host}:{port}/{database}")
+       
+        if not all([user, password, host, database]):
+            missing_vars = []
+            if not user: missing_vars.append('MYSQL_USER')
+            if not password: missing_vars.append('MYSQL_PASSWORD')
+            if not host: missing_vars.append('MYSQL_HOST')
+            if not database: missing_vars.append('MYSQL_DATABASE')
+            raise ValueError(f"Missing required database environment variables: {', '.join(missing_vars)}")
+        
+        # FIXED: Use dynamic database URI construction
+        database_url = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
    
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
-    
-    # FIXED: Use dynamic database URI construction
-    app.config['SQLALCHEMY_DATABASE_URI'] = f"mysql+pymysql://{user}:{password}@{host}:{port}/{database}"
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-        'pool_pre_ping': True,
-        'pool_recycle': 300,
-    }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(database_url)
+    
+    # Read replicas used by routes marked read_only (comma-separated URLs)
+    app.config['SQLALCHEMY_BINDS'] = replica_binds(os.getenv('REPLICA_DATABASE_URLS'))
    
     # Initialize extensions
     db.init_app(app)
@@ -52,5 +59,18 @@ def create_app():
     # Register blueprints
     from routes import main
     app.register_blueprint(main, url_prefix='/api')
+    
+    from response_cache import response_cache
+    response_cache.init_app(app)
+    
+    # Background workers for long-running tasks start with the first request
+    from task_queue import task_queue
+    task_queue.init_app(app)
+    
+    from skill_migration import backfill_skills
+    app.cli.add_command(backfill_skills)
+    
+    from reprocess import reprocess_snapshots
+    app.cli.add_command(reprocess_snapshots)
    
     return app
\ No newline at end of file
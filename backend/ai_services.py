@@ -1,57 +1,203 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import json
 import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 import google.generativeai as genai
 
+from prompt_budget import PromptBuilder, estimate_tokens, get_budget, token_usage
+
+class DeadlineResult:
+    """Value returned within a latency budget; provisional values are refined later"""
+    
+    def __init__(self, value, provisional: bool = False, future=None):
+        self.value = value
+        self.provisional = provisional
+        self.future = future
+    
+    def then(self, callback):
+        """Call callback with the model's answer once it arrives (immediately if it already has)"""
+        if self.future is None:
+            return
+        
+        def deliver(future):
+            try:
+                if future.cancelled() or future.exception() is not None:
+                    # No better answer is coming, so the fallback becomes final
+                    callback(self.value)
+                else:
+                    callback(future.result())
+            except Exception as e:
+                print(f"AI refinement error: {e}")
+        
+        self.future.add_done_callback(deliver)
+
 class AIService:
     def __init__(self):
         genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
         self.model = genai.GenerativeModel('gemini-1.5-flash')
+        
+        # Model calls that outlive their request budget keep running here
+        self.background = ThreadPoolExecutor(
+            max_workers=int(os.getenv('AI_BACKGROUND_WORKERS', '8')),
+            thread_name_prefix='ai-call'
+        )
+        # The executor's own queue is unbounded, so calls beyond this many queued or
+        # running are answered with their fallback instead of piling up
+        self.background_slots = threading.BoundedSemaphore(int(os.getenv('AI_BACKGROUND_MAX_PENDING', '64')))
+        self.request_timeout = float(os.getenv('AI_REQUEST_TIMEOUT_SECONDS', '30'))
+        self.deadlines = {
+            'calculate_job_match': float(os.getenv('AI_MATCH_DEADLINE_SECONDS', '2.0')),
+            'get_pricing_suggestions': float(os.getenv('AI_PRICING_DEADLINE_SECONDS', '3.0')),
+        }
+    
+    def _all_within_deadline(self, method: str, calls: List[Tuple]) -> List[DeadlineResult]:
+        """Run (func, args, fallback) model calls together under one deadline for the whole batch"""
+        futures = [self._submit_background(func, args) for func, args, _ in calls]
+        wait([future for future in futures if future is not None], timeout=self.deadlines[method])
 
-    def calculate_job_match(self, user_skills: List[str], job_skills: List[str], job_description: str) -> float:
-        """Calculate match score between user skills and job requirements"""
+        results = []
+        for future, (_, _, fallback) in zip(futures, calls):
+            if future is None:
+                # Shed: the background pool is full, so no answer will follow
+                results.append(DeadlineResult(fallback()))
+            elif not future.done():
+                results.append(DeadlineResult(fallback(), provisional=True, future=future))
+            elif future.exception() is not None:
+                # A failed call is never refined, so its fallback is not provisional
+                print(f"AI {method} error: {future.exception()}")
+                results.append(DeadlineResult(fallback()))
+            else:
+                results.append(DeadlineResult(future.result()))
+        return results
+
+    def _submit_background(self, func, args):
+        """Future for func(*args), or None when too many model calls are already pending"""
+        if not self.background_slots.acquire(blocking=False):
+            print(f"AI background pool full, shedding {getattr(func, '__name__', func)}")
+            return None
         try:
-            prompt = f"""
-            User Skills: {', '.join(user_skills)}
-            Job Required Skills: {', '.join(job_skills)}
-            Job Description: {job_description[:500]}
-
-            Calculate a match score (0-100) based on:
-            1. Direct skill matches (40%)
-            2. Related/transferable skills (30%)
-            3. Experience level fit (20%)
-            4. Project complexity fit (10%)
-
-            Return only the numerical score.
-            """
+            future = self.background.submit(func, *args)
+        except Exception:
+            self.background_slots.release()
+            raise
+        future.add_done_callback(lambda _: self.background_slots.release())
+        return future
+
+    def _within_deadline(self, method: str, func, args, fallback) -> DeadlineResult:
+        """Run a model call, answering with the local fallback if it misses the method's deadline"""
+        return self._all_within_deadline(method, [(func, args, fallback)])[0]
+
+    def _generate(self, builder: PromptBuilder, user_id: int = None) -> str:
+        """Send a budgeted prompt to the model and record its token usage"""
+        prompt = builder.build()
+        budget = get_budget(builder.method)
+
+        result = self.model.generate_content(
+            prompt,
+            generation_config={'max_output_tokens': budget['output']},
+            # A hung call would otherwise hold a background worker indefinitely
+            request_options={'timeout': self.request_timeout}
+        )
+        text = result.text
+
+        # Prefer the provider's counts, falling back to the local estimate
+        usage = getattr(result, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', None) or estimate_tokens(prompt)
+        completion_tokens = getattr(usage, 'candidates_token_count', None) or estimate_tokens(text)
+        token_usage.record(user_id, builder.method, prompt_tokens, completion_tokens)
+
+        return text
+
+    def _request_job_match(self, user_skills: List[str], job_skills: List[str], job_description: str,
+                           user_id: int = None) -> float:
+        builder = PromptBuilder('calculate_job_match')
+        builder.add_list('User Skills: ', user_skills, priority=60)
+        builder.add_list('Job Required Skills: ', job_skills, priority=50)
+        builder.add(f"Job Description: {job_description}", priority=10)
+        builder.add("""
+        Calculate a match score (0-100) based on:
+        1. Direct skill matches (40%)
+        2. Related/transferable skills (30%)
+        3. Experience level fit (20%)
+        4. Project complexity fit (10%)
 
-            result = self.model.generate_content(prompt)
-            score_text = result.text.strip()
-            # Use raw string for regex pattern
-            score = float(re.findall(r'\d+', score_text)[0])
-            return min(100, max(0, score))
+        Return only the numerical score.
+        """, priority=100)
+
+        score_text = self._generate(builder, user_id).strip()
+        # Use raw string for regex pattern
+        score = float(re.findall(r'\d+', score_text)[0])
+        return min(100, max(0, score))
+
+    def calculate_job_match(self, user_skills: List[str], job_skills: List[str], job_description: str,
+                            user_id: int = None) -> float:
+        """Calculate match score between user skills and job requirements"""
+        try:
+            return self._request_job_match(user_skills, job_skills, job_description, user_id)
 
         except Exception as e:
             print(f"AI match calculation error: {e}")
-            return 0.0
+            return self.estimate_job_match(user_skills, job_skills)
 
-    def generate_proposal(self, user_data: Dict, job_data: Dict) -> str:
-        """Generate a personalized proposal for a job"""
-        try:
-            prompt = f"""
-            Create a professional freelance proposal for:
+    def calculate_job_match_within(self, user_skills: List[str], job_skills: List[str], job_description: str,
+                                   user_id: int = None) -> DeadlineResult:
+        """Match score within the latency budget, falling back to the local estimate"""
+        return self._within_deadline(
+            'calculate_job_match',
+            self._request_job_match,
+            (user_skills, job_skills, job_description, user_id),
+            lambda: self.estimate_job_match(user_skills, job_skills)
+        )
 
+    def calculate_job_matches_within(self, user_skills: List[str], jobs: List[Tuple[List[str], str]],
+                                     user_id: int = None) -> List[DeadlineResult]:
+        """Match scores for (job_skills, job_description) pairs, all bounded by a single deadline"""
+        return self._all_within_deadline('calculate_job_match', [
+            (
+                self._request_job_match,
+                (user_skills, job_skills, job_description, user_id),
+                lambda job_skills=job_skills: self.estimate_job_match(user_skills, job_skills)
+            )
+            for job_skills, job_description in jobs
+        ])
+
+    def estimate_job_match(self, user_skills: List[str], job_skills: List[str]) -> float:
+        """Local skill-overlap score (0-100) that needs no model call"""
+        user_set = {skill.strip().lower() for skill in user_skills if skill.strip()}
+        job_set = {skill.strip().lower() for skill in job_skills if skill.strip()} - {'general'}
+        if not job_set:
+            # Nothing specific to match against, so neither a good nor a bad fit
+            return 50.0
+        return round(100.0 * len(user_set & job_set) / len(job_set), 1)
+
+    def build_profile_section(self, user_data: Dict) -> str:
+        """Freelancer part of the proposal prompt, shared by every job for the same user"""
+        return f"""
             Freelancer Profile:
             - Skills: {user_data.get('skills', '')}
             - Experience: {user_data.get('experience_level', '')}
             - Hourly Rate: ${user_data.get('hourly_rate', 0)}/hour
+            """
+
+    def generate_proposal(self, user_data: Dict, job_data: Dict, profile_section: str = None,
+                          user_id: int = None) -> str:
+        """Generate a personalized proposal for a job"""
+        try:
+            if profile_section is None:
+                profile_section = self.build_profile_section(user_data)
 
+            builder = PromptBuilder('generate_proposal')
+            builder.add("Create a professional freelance proposal for:", priority=100)
+            builder.add(profile_section, priority=50)
+            builder.add(f"""
             Job Details:
             - Title: {job_data.get('title', '')}
-            - Description: {job_data.get('description', '')[:300]}
-            - Budget: ${job_data.get('budget', 'Not specified')}
-
+            - Budget: ${job_data.get('budget', 'Not specified')}""", priority=80)
+            builder.add(f"- Description: {job_data.get('description', '')}", priority=10)
+            builder.add("""
             Write a compelling 150-200 word proposal that:
             1. Shows understanding of requirements
             2. Highlights relevant skills
@@ -59,48 +205,80 @@ class AIService:
             4. Ends with a call to action
 
             Keep it professional but personable.
-            """
+            """, priority=100)
 
-            result = self.model.generate_content(prompt)
-            return result.text.strip()
+            return self._generate(builder, user_id or user_data.get('id')).strip()
 
         except Exception as e:
             print(f"AI proposal generation error: {e}")
             return "I'm interested in your project and believe my skills align well with your requirements. I'd love to discuss how I can help you achieve your goals."
 
+    def generate_proposals_batch(self, user_data: Dict, jobs: List[Dict], max_concurrency: int = 5):
+        """Draft proposals for many jobs concurrently, yielding (job, content) as each finishes"""
+        profile_section = self.build_profile_section(user_data)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(jobs)))) as executor:
+            futures = {
+                executor.submit(self.generate_proposal, user_data, job, profile_section): job
+                for job in jobs
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _request_pricing(self, user_id: int, total_earnings: float, total_hours: float, current_rate: float) -> Dict:
+        builder = PromptBuilder('get_pricing_suggestions')
+        builder.add(f"""
+        Freelancer Analysis:
+        - Total Earnings: ${total_earnings}
+        - Total Hours: {total_hours}
+        - Current Average Rate: ${current_rate}/hour
+
+        Based on this data, provide pricing strategy advice:
+        1. Should they increase/decrease rates?
+        2. What's a good target hourly rate?
+        3. One actionable tip for pricing
+
+        Format as JSON with keys: recommendation, target_rate, tip
+        """, priority=100)
+
+        return json.loads(self._generate(builder, user_id))
+
     def get_pricing_suggestions(self, user_id: int, total_earnings: float, total_hours: float, current_rate: float) -> Dict:
         """Get AI-powered pricing suggestions"""
         try:
-            prompt = f"""
-            Freelancer Analysis:
-            - Total Earnings: ${total_earnings}
-            - Total Hours: {total_hours}
-            - Current Average Rate: ${current_rate}/hour
-
-            Based on this data, provide pricing strategy advice:
-            1. Should they increase/decrease rates?
-            2. What's a good target hourly rate?
-            3. One actionable tip for pricing
-
-            Format as JSON with keys: recommendation, target_rate, tip
-            """
+            return self._request_pricing(user_id, total_earnings, total_hours, current_rate)
 
-            result = self.model.generate_content(prompt)
-
-            try:
-                return json.loads(result.text)
-            except json.JSONDecodeError:
-                return {
-                    "recommendation": "Consider reviewing your rates based on market standards",
-                    "target_rate": current_rate * 1.1,
-                    "tip": "Track your project success rate to optimize pricing"
-                }
+        except json.JSONDecodeError:
+            return {
+                "recommendation": "Consider reviewing your rates based on market standards",
+                "target_rate": current_rate * 1.1,
+                "tip": "Track your project success rate to optimize pricing"
+            }
 
         except Exception as e:
             print(f"AI pricing suggestion error: {e}")
             return {"recommendation": "Unable to generate suggestions at this time"}
 
-    def analyze_skill_gaps(self, user_skills: List[str], missed_job_skills: List[str]) -> List[Dict]:
+    def estimate_pricing(self, current_rate: float) -> Dict:
+        """Rule-of-thumb pricing advice that needs no model call"""
+        return {
+            'recommendation': 'Based on your experience, consider reviewing market rates',
+            'target_rate': round(max(current_rate * 1.1, 25), 2),
+            'tip': 'Focus on building a strong portfolio to justify higher rates'
+        }
+
+    def get_pricing_suggestions_within(self, user_id: int, total_earnings: float, total_hours: float,
+                                       current_rate: float) -> DeadlineResult:
+        """Pricing suggestions within the latency budget, falling back to the local estimate"""
+        return self._within_deadline(
+            'get_pricing_suggestions',
+            self._request_pricing,
+            (user_id, total_earnings, total_hours, current_rate),
+            lambda: self.estimate_pricing(current_rate)
+        )
+
+    def analyze_skill_gaps(self, user_skills: List[str], missed_job_skills: List[str],
+                           user_id: int = None) -> List[Dict]:
         """Analyze skill gaps from missed opportunities"""
         try:
             all_missed_skills = []
@@ -108,10 +286,12 @@ class AIService:
                 if skills_str:
                     all_missed_skills.extend([s.strip() for s in skills_str.split(',')])
 
-            prompt = f"""
-            User Current Skills: {', '.join(user_skills)}
-            Skills from Missed Jobs: {', '.join(all_missed_skills[:20])}
-
+            builder = PromptBuilder('analyze_skill_gaps')
+            builder.add_list('User Current Skills: ', user_skills, priority=50)
+            # Most frequently missed skills first so truncation drops the rare ones
+            missed_by_frequency = [skill for skill, _ in Counter(all_missed_skills).most_common()]
+            builder.add_list('Skills from Missed Jobs: ', missed_by_frequency, priority=10)
+            builder.add("""
             Identify the top 5 missing skills that would:
             1. Open the most new opportunities
             2. Command higher rates
@@ -123,11 +303,11 @@ class AIService:
             - learning resource suggestion
 
             Format as JSON array.
-            """
+            """, priority=100)
 
-            result = self.model.generate_content(prompt)
+            text = self._generate(builder, user_id)
             try:
-                return json.loads(result.text)
+                return json.loads(text)
             except json.JSONDecodeError:
                 return [{"skill": "React", "priority": 8, "resource": "Online React course"}]
 
@@ -135,14 +315,18 @@ class AIService:
             print(f"AI skill gap analysis error: {e}")
             return []
 
-    def generate_communication_response(self, message_type: str, client_message: str, context: Dict) -> str:
+    def generate_communication_response(self, message_type: str, client_message: str, context: Dict,
+                                        user_id: int = None) -> str:
         """Generate professional communication responses"""
         try:
-            prompt = f"""
-            Communication Type: {message_type}
-            Client Message: "{client_message}"
-            Context: {json.dumps(context)}
-
+            builder = PromptBuilder('generate_communication_response')
+            builder.add(f"Communication Type: {message_type}", priority=100)
+            builder.add(f'Client Message: "{client_message}"', priority=60)
+            # Each context entry is its own section so one large value cannot crowd out the rest
+            for key, value in context.items():
+                rendered = value if isinstance(value, str) else json.dumps(value, default=str)
+                builder.add(f"Context - {key}: {rendered}", priority=20)
+            builder.add("""
             Generate a professional, diplomatic response that:
             1. Addresses the client's concern
             2. Maintains a positive relationship
@@ -150,11 +334,33 @@ class AIService:
             4. Suggests next steps if appropriate
 
             Keep it concise (2-3 sentences) and professional.
-            """
+            """, priority=100)
 
-            result = self.model.generate_content(prompt)
-            return result.text.strip()
+            return self._generate(builder, user_id).strip()
 
         except Exception as e:
             print(f"AI communication response error: {e}")
             return "Thank you for your message. I'll review this and get back to you shortly with a detailed response."
+
+    def summarize_conversation(self, previous_summary: str, messages: List[Dict], user_id: int = None) -> str:
+        """Fold older client messages into a short running summary of the thread"""
+        try:
+            builder = PromptBuilder('summarize_conversation')
+            builder.add("""
+            You maintain a running summary of a freelancer's conversation with a client.
+            Update the summary with the new messages below. Keep agreed scope, prices,
+            deadlines, open questions and the client's tone. Use at most 120 words.
+            """, priority=100)
+            builder.add(f"Current Summary: {previous_summary or 'None yet'}", priority=60)
+            for message in messages:
+                builder.add(
+                    f"- [{message.get('message_type')}] Client: {message.get('client_message') or ''} "
+                    f"| Freelancer: {message.get('user_response') or message.get('ai_suggestion') or ''}",
+                    priority=20
+                )
+
+            return self._generate(builder, user_id).strip()
+
+        except Exception as e:
+            print(f"AI conversation summary error: {e}")
+            return None
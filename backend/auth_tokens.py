@@ -0,0 +1,55 @@
+import os
+from typing import NamedTuple, Optional
+
+from flask import current_app, g, has_request_context, request, session
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+TOKEN_SALT = 'access-token'
+
+
+class Identity(NamedTuple):
+    """The claims carried by an access token"""
+    id: int
+    email: Optional[str] = None
+
+
+class AccessTokens:
+    """HMAC-signed, expiring access tokens keyed by the app's SECRET_KEY"""
+
+    def __init__(self, max_age: int = None):
+        self.max_age = max_age or int(os.getenv('ACCESS_TOKEN_TTL_SECONDS', '86400'))
+
+    def _serializer(self) -> URLSafeTimedSerializer:
+        return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+    def issue(self, user) -> str:
+        return self._serializer().dumps({'uid': user.id, 'email': user.email})
+
+    def verify(self, token: str) -> Optional[Identity]:
+        """Identity for a valid, unexpired token, otherwise None"""
+        try:
+            claims = self._serializer().loads(token, max_age=self.max_age)
+        except (SignatureExpired, BadSignature):
+            return None
+        return Identity(id=claims['uid'], email=claims.get('email'))
+
+    def from_request(self) -> Optional[Identity]:
+        # Bearer tokens first; the signed cookie session still works for older clients
+        header = request.headers.get('Authorization', '')
+        if header.lower().startswith('bearer '):
+            return self.verify(header[7:].strip())
+        if 'user_id' in session:
+            return Identity(id=session['user_id'])
+        return None
+
+
+access_tokens = AccessTokens()
+
+
+def current_identity() -> Optional[Identity]:
+    """Caller's identity, resolved once per request"""
+    if not has_request_context():
+        return None
+    if 'identity' not in g:
+        g.identity = access_tokens.from_request()
+    return g.identity
@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passwords import PasswordHasher
+
+
+def bench(algorithm, cost, seconds, workers):
+    hasher = PasswordHasher(algorithm=algorithm, cost=cost, max_workers=workers)
+    stored = hasher.hash("correct horse battery staple")
+
+    # Single thread: verifications per second on one core
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.verify(stored, "correct horse battery staple")
+        count += 1
+    per_core = count / (time.perf_counter() - start)
+
+    # Many concurrent logins funnelled through the bounded hashing pool
+    count = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers * 4) as clients:
+        while time.perf_counter() - start < seconds:
+            futures = [clients.submit(hasher.verify, stored, "correct horse battery staple")
+                       for _ in range(workers * 4)]
+            count += sum(1 for future in futures if future.result())
+    total = count / (time.perf_counter() - start)
+
+    hasher.executor.shutdown()
+    return per_core, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark login password verification")
+    parser.add_argument("--algorithm", choices=["pbkdf2", "scrypt"], default="pbkdf2")
+    parser.add_argument("--costs", default=None,
+                        help="Comma-separated costs to compare (pbkdf2 iterations or scrypt N)")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    default_costs = "100000,300000,600000" if args.algorithm == "pbkdf2" else "8192,16384,32768"
+    costs = [int(cost) for cost in (args.costs or default_costs).split(",")]
+
+    print(f"🔐 {args.algorithm} login verification, {args.workers} hashing workers\n")
+    print(f"{'cost':>10} {'logins/s/core':>15} {'logins/s total':>16}")
+    for cost in costs:
+        per_core, total = bench(args.algorithm, cost, args.seconds, args.workers)
+        print(f"{cost:>10} {per_core:>15.1f} {total:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
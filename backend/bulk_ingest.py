@@ -0,0 +1,226 @@
+import hmac
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from __init__ import db
+from models import JobOpportunity, Skill, job_skills, normalize_skill, parse_skills
+from response_cache import response_cache
+from job_dedup import NearDuplicateIndex, job_dedup_index
+
+
+class BulkJobIngestor:
+    """Stream newline-delimited JSON jobs into job_opportunities in chunks"""
+
+    REQUIRED_FIELDS = ('title', 'description', 'source')
+
+    def __init__(self, chunk_size: int = 1000, max_errors: int = 1000, feed_token: str = None):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+        self.feed_token = feed_token or os.getenv('BULK_INGEST_TOKEN')
+
+    def accepts(self, token: Optional[str]) -> bool:
+        """Whether a request carries the configured feed token; always False when none is configured"""
+        if not self.feed_token or not token:
+            return False
+        return hmac.compare_digest(token.encode('utf-8'), self.feed_token.encode('utf-8'))
+
+    def ingest(self, lines: Iterable[bytes]) -> Dict:
+        """Parse, validate, dedupe and insert jobs without buffering the whole body"""
+        report = {
+            'received': 0,
+            'inserted': 0,
+            'duplicates': 0,
+            'errors': [],
+            'error_count': 0
+        }
+        chunk = []
+
+        for line_number, raw_line in enumerate(lines, start=1):
+            if isinstance(raw_line, bytes):
+                raw_line = raw_line.decode('utf-8', errors='replace')
+            raw_line = raw_line.strip()
+            if not raw_line:
+                continue
+
+            report['received'] += 1
+            row, error = self.parse_line(raw_line)
+            if error:
+                self._record_error(report, line_number, error)
+                continue
+
+            chunk.append((line_number, row))
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk, report)
+                chunk = []
+
+        if chunk:
+            self._flush(chunk, report)
+
+        return report
+
+    def parse_line(self, raw_line: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Turn one NDJSON line into a job_opportunities row or an error message"""
+        try:
+            data = json.loads(raw_line)
+        except json.JSONDecodeError as e:
+            return None, f'Invalid JSON: {e.msg}'
+
+        if not isinstance(data, dict):
+            return None, 'Each line must be a JSON object'
+
+        missing = [field for field in self.REQUIRED_FIELDS if not data.get(field)]
+        if missing:
+            return None, f"Missing required fields: {', '.join(missing)}"
+
+        skills = data.get('required_skills') or []
+        if isinstance(skills, str):
+            skills = [s.strip() for s in skills.split(',') if s.strip()]
+        elif not isinstance(skills, list):
+            return None, 'required_skills must be a list or a comma-separated string'
+
+        budget = data.get('budget')
+        if budget is not None:
+            try:
+                budget = float(budget)
+            except (TypeError, ValueError):
+                return None, 'budget must be a number'
+
+        title = str(data['title']).strip()
+        source = str(data['source']).strip()
+        if len(title) > 255:
+            return None, 'title must be at most 255 characters'
+        if len(source) > 100:
+            return None, 'source must be at most 100 characters'
+
+        return {
+            'title': title,
+            'description': str(data['description']),
+            'required_skills': ', '.join(str(s).strip() for s in skills),
+            'budget': budget,
+            'source': source,
+            'source_url': data.get('url') or data.get('source_url'),
+            'client_name': data.get('client_name'),
+            'match_score': 0.0,
+            'is_active': True,
+            'canonical_job_id': None
+        }, None
+
+    def _flush(self, chunk: List[Tuple[int, Dict]], report: Dict):
+        """Dedupe one chunk against the table, cluster near-duplicates and insert with executemany"""
+        titles = {row['title'] for _, row in chunk}
+        sources = {row['source'] for _, row in chunk}
+
+        existing = {
+            (title, source) for title, source in db.session.query(
+                JobOpportunity.title, JobOpportunity.source
+            ).filter(
+                JobOpportunity.title.in_(titles),
+                JobOpportunity.source.in_(sources)
+            )
+        }
+
+        rows = []
+        for line_number, row in chunk:
+            key = (row['title'], row['source'])
+            if key in existing:
+                report['duplicates'] += 1
+                continue
+            existing.add(key)
+            rows.append((line_number, row))
+
+        if not rows:
+            return
+
+        # Near-duplicates of indexed jobs join that job's cluster; near-duplicates of rows in
+        # this chunk wait for a second pass, once their canonical row has an id
+        job_dedup_index.ensure_loaded()
+        chunk_index = NearDuplicateIndex()
+        canonical_rows, clustered_rows, deferred_rows = [], [], []
+        signatures = {}
+        for position, (line_number, row) in enumerate(rows):
+            signature = job_dedup_index.signature_for_job(row)
+            signatures[position] = signature
+            canonical_id = job_dedup_index.find(signature)
+            if canonical_id:
+                row['canonical_job_id'] = canonical_id
+                clustered_rows.append((line_number, row))
+            elif chunk_index.find(signature) is not None:
+                deferred_rows.append((line_number, row, signature))
+            else:
+                chunk_index.add(position, signature)
+                canonical_rows.append((position, line_number, row))
+
+        first_pass = [(line_number, row) for _, line_number, row in canonical_rows] + clustered_rows
+        if not self._insert(first_pass, report):
+            # Their canonical rows were never written, so these have nothing to cluster under
+            for line_number, _, _ in deferred_rows:
+                self._record_error(report, line_number, 'Insert failed: near-duplicate of a row in a failed batch')
+            return
+        self._index_inserted(canonical_rows, signatures)
+
+        for line_number, row, signature in deferred_rows:
+            row['canonical_job_id'] = job_dedup_index.find(signature)
+        self._insert([(line_number, row) for line_number, row, _ in deferred_rows], report)
+
+    def _insert(self, rows: List[Tuple[int, Dict]], report: Dict) -> bool:
+        if not rows:
+            return True
+        try:
+            db.session.execute(insert(JobOpportunity.__table__), [row for _, row in rows])
+            self._link_skills([row for _, row in rows])
+            db.session.commit()
+            # Core inserts skip ORM events, so the jobs stamp is bumped explicitly
+            response_cache.bump('jobs')
+            report['inserted'] += len(rows)
+            return True
+        except Exception as e:
+            db.session.rollback()
+            for line_number, _ in rows:
+                self._record_error(report, line_number, f'Insert failed: {str(e)}')
+            return False
+
+    def _link_skills(self, rows: List[Dict]):
+        """Write job_skills links for rows just inserted, in the same transaction"""
+        skills_by_key = {
+            (row['title'], row['source']): parse_skills(row['required_skills']) for row in rows
+        }
+        names = [name for skills in skills_by_key.values() for name in skills]
+        skill_ids = {skill.slug: skill.id for skill in Skill.get_or_create_many(names)}
+        if not skill_ids:
+            return
+
+        job_ids = {
+            (title, source): job_id for job_id, title, source in db.session.query(
+                JobOpportunity.id, JobOpportunity.title, JobOpportunity.source
+            ).filter(JobOpportunity.title.in_({title for title, _ in skills_by_key}))
+        }
+        links = [
+            {'job_id': job_ids[key], 'skill_id': skill_ids[normalize_skill(name)[:100]]}
+            for key, skills in skills_by_key.items() if key in job_ids
+            for name in skills
+        ]
+        if links:
+            db.session.execute(insert(job_skills), links)
+
+    def _index_inserted(self, canonical_rows: List[Tuple[int, int, Dict]], signatures: Dict):
+        """Look up ids of the canonical rows just inserted and add them to the near-duplicate index"""
+        if not canonical_rows:
+            return
+        titles = {row['title'] for _, _, row in canonical_rows}
+        ids = {
+            (title, source): job_id for job_id, title, source in db.session.query(
+                JobOpportunity.id, JobOpportunity.title, JobOpportunity.source
+            ).filter(JobOpportunity.title.in_(titles))
+        }
+        for position, _, row in canonical_rows:
+            job_id = ids.get((row['title'], row['source']))
+            if job_id:
+                job_dedup_index.add(job_id, signatures[position])
+
+    def _record_error(self, report: Dict, line_number: int, message: str):
+        report['error_count'] += 1
+        if len(report['errors']) < self.max_errors:
+            report['errors'].append({'line': line_number, 'error': message})
@@ -0,0 +1,104 @@
+from typing import Dict, List, Optional
+
+from __init__ import db
+from models import ClientCommunication, CommunicationThread, Project
+
+
+class CommunicationService:
+    """Client message replies built from a rolling thread summary plus the latest messages"""
+
+    def __init__(self, ai_service, recent_messages: int = 4, summarize_after: int = 8):
+        self.ai_service = ai_service
+        # Messages kept verbatim when older ones are folded into the summary
+        self.recent_messages = recent_messages
+        # Unsummarized messages allowed to pile up before older ones are folded in
+        self.summarize_after = summarize_after
+
+    def get_thread(self, user_id: int, project_id: Optional[int]) -> CommunicationThread:
+        thread = CommunicationThread.query.filter_by(user_id=user_id, project_id=project_id).first()
+        if not thread:
+            thread = CommunicationThread(user_id=user_id, project_id=project_id, summarized_through_id=0)
+            db.session.add(thread)
+            db.session.flush()
+        return thread
+
+    def respond(self, user_id: int, project: Optional[Project], message_type: str,
+                client_message: str) -> ClientCommunication:
+        """Suggest a reply from the thread summary and latest messages, then store the exchange"""
+        project_id = project.id if project else None
+        thread = self.get_thread(user_id, project_id)
+
+        context = {}
+        if project:
+            context['project'] = {
+                'title': project.title,
+                'client_name': project.client_name,
+                'status': project.status,
+                'budget': project.budget
+            }
+        if thread.summary:
+            context['conversation_summary'] = thread.summary
+        recent = self.recent(thread)
+        if recent:
+            context['recent_messages'] = [self._message_for_prompt(message) for message in recent]
+
+        suggestion = self.ai_service.generate_communication_response(
+            message_type, client_message, context, user_id=user_id
+        )
+
+        communication = ClientCommunication(
+            user_id=user_id,
+            project_id=project_id,
+            message_type=message_type,
+            client_message=client_message,
+            ai_suggestion=suggestion
+        )
+        db.session.add(communication)
+        db.session.commit()
+        return communication
+
+    def recent(self, thread: CommunicationThread) -> List[ClientCommunication]:
+        """Every unsummarized message, oldest first
+
+        Compaction keeps this to about summarize_after messages; capping it lower would
+        drop messages that are neither in the summary nor in the prompt.
+        """
+        return self._unsummarized(thread).order_by(ClientCommunication.id).all()
+
+    def needs_compaction(self, thread: CommunicationThread) -> bool:
+        return self._unsummarized(thread).count() > self.summarize_after
+
+    def compact(self, thread: CommunicationThread) -> bool:
+        """Fold everything but the most recent messages into the thread summary"""
+        pending = self._unsummarized(thread).order_by(ClientCommunication.id).all()
+        to_fold = pending[:-self.recent_messages] if self.recent_messages else pending
+        if not to_fold:
+            return False
+
+        summary = self.ai_service.summarize_conversation(
+            thread.summary,
+            [self._message_for_prompt(message) for message in to_fold],
+            user_id=thread.user_id
+        )
+        if not summary:
+            return False
+
+        thread.summary = summary
+        thread.summarized_through_id = to_fold[-1].id
+        db.session.commit()
+        return True
+
+    def _unsummarized(self, thread: CommunicationThread):
+        return ClientCommunication.query.filter(
+            ClientCommunication.user_id == thread.user_id,
+            ClientCommunication.project_id == thread.project_id,
+            ClientCommunication.id > (thread.summarized_through_id or 0)
+        )
+
+    def _message_for_prompt(self, message: ClientCommunication) -> Dict:
+        return {
+            'message_type': message.message_type,
+            'client_message': message.client_message,
+            'ai_suggestion': message.ai_suggestion,
+            'user_response': message.user_response
+        }
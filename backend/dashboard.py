@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import copy_current_request_context, g
+
+
+def select_fields(value, fields: Optional[List[str]]):
+    """Keep only the requested keys of a dict or of every dict in a list"""
+    if not fields:
+        return value
+    if isinstance(value, list):
+        return [select_fields(item, fields) for item in value]
+    if isinstance(value, dict):
+        return {key: value[key] for key in fields if key in value}
+    return value
+
+
+class DashboardAggregator:
+    """Load dashboard sections concurrently, each on its own pooled connection"""
+
+    def __init__(self, max_workers: int = None, deferred_workers: int = None):
+        self.loaders: Dict[str, Callable] = {}
+        self.deferred = set()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('DASHBOARD_WORKERS', '8')),
+            thread_name_prefix='dashboard'
+        )
+        # Slow sections get their own pool so they never queue ahead of fast ones
+        self.deferred_executor = ThreadPoolExecutor(
+            max_workers=deferred_workers or int(os.getenv('DASHBOARD_DEFERRED_WORKERS', '2')),
+            thread_name_prefix='dashboard-deferred'
+        )
+
+    def section(self, name: str, deferred: bool = False):
+        """Register loader(user_id) for a section; deferred sections are slow (AI calls)"""
+        def decorator(loader):
+            self.loaders[name] = loader
+            if deferred:
+                self.deferred.add(name)
+            return loader
+        return decorator
+
+    def parse_selection(self, args) -> Tuple[List[str], Dict[str, List[str]]]:
+        """Sections from ?sections=a,b and per-section fields from ?fields.<section>=x,y"""
+        requested = args.get('sections')
+        names = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(self.loaders)
+        unknown = [name for name in names if name not in self.loaders]
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(unknown)}")
+
+        fields = {}
+        for name in names:
+            selected = args.get(f'fields.{name}')
+            if selected:
+                fields[name] = [field.strip() for field in selected.split(',') if field.strip()]
+        return names, fields
+
+    def submit(self, user_id: int, names: List[str]) -> Dict:
+        """Start the loaders; must be called inside the request"""
+        futures = {}
+        for name in names:
+            executor = self.deferred_executor if name in self.deferred else self.executor
+            futures[executor.submit(self._run_in_request(self.loaders[name]), user_id)] = name
+        return futures
+
+    def collect(self, user_id: int, names: List[str], fields: Dict[str, List[str]]) -> Dict:
+        """Payload with every requested section, waiting for all of them"""
+        payload = {'errors': {}}
+        for name, value, error in self.iter_completed(user_id, names, fields):
+            if error:
+                payload['errors'][name] = error
+            else:
+                payload[name] = value
+        return payload
+
+    def iter_completed(self, user_id: int, names: List[str],
+                       fields: Dict[str, List[str]]) -> Iterator[Tuple[str, object, Optional[str]]]:
+        """(section, value, error) in the order sections finish"""
+        futures = self.submit(user_id, names)
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                yield name, select_fields(future.result(), fields.get(name)), None
+            except Exception as e:
+                yield name, None, f'Failed to load {name}: {str(e)}'
+
+    @staticmethod
+    def _run_in_request(loader):
+        # A copied request context gets its own app context and therefore its own
+        # database session, while still seeing the caller's cookie session
+        @copy_current_request_context
+        def run(user_id):
+            g.read_only_route = True
+            return loader(user_id)
+        return run
@@ -0,0 +1,90 @@
+import itertools
+import os
+import time
+from functools import wraps
+
+from flask import g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND_PREFIX = 'replica_'
+STICKY_KEY = '_primary_until'
+
+
+def engine_options(url: str) -> dict:
+    """Pool settings from the environment; sizing only applies to server databases"""
+    options = {
+        'pool_pre_ping': True,
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '300')),
+    }
+    if not url.startswith('sqlite'):
+        options.update({
+            'pool_size': int(os.getenv('DB_POOL_SIZE', '10')),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '20')),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', '30')),
+        })
+    return options
+
+
+def replica_binds(urls: str) -> dict:
+    """SQLALCHEMY_BINDS entries for a comma-separated list of replica URLs"""
+    binds = {}
+    for index, url in enumerate(u.strip() for u in (urls or '').split(',') if u.strip()):
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = {'url': url, **engine_options(url)}
+    return binds
+
+
+def read_only(view):
+    """Mark a route as safe to serve from a replica"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.read_only_route = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def force_primary():
+    """Send the rest of this request's reads to the primary"""
+    if has_request_context():
+        g.read_only_route = False
+
+
+class RoutingSession(Session):
+    """Send reads from read-only routes to a replica and everything else to the primary"""
+
+    _replica_cycle = None
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._use_replica():
+            replica = self._next_replica()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+    def _use_replica(self) -> bool:
+        if self._flushing or self.info.get('wrote') or not has_request_context():
+            return False
+        if not g.get('read_only_route'):
+            return False
+        # Read-your-writes: a client that just wrote keeps reading the primary for a while
+        return flask_session.get(STICKY_KEY, 0) < time.time()
+
+    def _next_replica(self):
+        engines = self._db.engines
+        names = sorted(key for key in engines if isinstance(key, str) and key.startswith(REPLICA_BIND_PREFIX))
+        if not names:
+            return None
+        if RoutingSession._replica_cycle is None or RoutingSession._replica_cycle[0] != names:
+            RoutingSession._replica_cycle = (names, itertools.cycle(names))
+        return engines[next(RoutingSession._replica_cycle[1])]
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(db_session, flush_context):
+    db_session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _stick_to_primary(db_session):
+    if db_session.info.pop('wrote', False) and has_request_context():
+        flask_session[STICKY_KEY] = time.time() + float(os.getenv('READ_YOUR_WRITES_SECONDS', '5'))
@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+from __init__ import db
+from models import Project, TimeLog, Proposal, JobOpportunity
+
+
+class DataExporter:
+    """Stream a user's projects, time logs and proposals as CSV or NDJSON"""
+
+    FORMATS = ('csv', 'ndjson')
+
+    def __init__(self, batch_size: int = 500):
+        self.batch_size = batch_size
+
+    def resources(self) -> Dict:
+        # Column selections avoid loading ORM objects and their lazy relationships row by row
+        return {
+            'projects': {
+                'columns': [
+                    Project.id, Project.title, Project.client_name, Project.description,
+                    Project.budget, Project.hours_worked, Project.status,
+                    Project.start_date, Project.end_date, Project.created_at
+                ],
+                'user_column': Project.user_id,
+                'date_column': Project.created_at,
+                'joins': [],
+                'order_by': Project.id
+            },
+            'time_logs': {
+                'columns': [
+                    TimeLog.id, TimeLog.project_id, Project.title.label('project_title'),
+                    TimeLog.description, TimeLog.hours, TimeLog.date_logged, TimeLog.created_at
+                ],
+                'user_column': TimeLog.user_id,
+                'date_column': TimeLog.date_logged,
+                'joins': [(Project, TimeLog.project_id == Project.id)],
+                'order_by': TimeLog.id
+            },
+            'proposals': {
+                'columns': [
+                    Proposal.id, Proposal.job_id, JobOpportunity.title.label('job_title'),
+                    Proposal.content, Proposal.status, Proposal.sent_at
+                ],
+                'user_column': Proposal.user_id,
+                'date_column': Proposal.sent_at,
+                'joins': [(JobOpportunity, Proposal.job_id == JobOpportunity.id)],
+                'order_by': Proposal.id
+            }
+        }
+
+    def stream(self, resource: str, user_id: int, fmt: str,
+               start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+        """Yield serialized rows one batch at a time from a server-side cursor"""
+        spec = self.resources()[resource]
+        query = db.session.query(*spec['columns'])
+        for target, condition in spec['joins']:
+            query = query.outerjoin(target, condition)
+
+        query = query.filter(spec['user_column'] == user_id)
+        if start:
+            query = query.filter(spec['date_column'] >= start)
+        if end:
+            # End date is inclusive
+            query = query.filter(spec['date_column'] < _day_after(end))
+
+        query = query.order_by(spec['order_by']).execution_options(
+            stream_results=True, yield_per=self.batch_size
+        )
+        field_names = [column.key for column in spec['columns']]
+
+        if fmt == 'csv':
+            return self._stream_csv(query, field_names)
+        return self._stream_ndjson(query, field_names)
+
+    def _stream_csv(self, query, field_names) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        # Header goes out before the first row is fetched
+        writer.writerow(field_names)
+        yield self._drain(buffer)
+
+        for count, row in enumerate(query, start=1):
+            writer.writerow([_serialize_value(value) for value in row])
+            if count % self.batch_size == 0:
+                yield self._drain(buffer)
+
+        remaining = self._drain(buffer)
+        if remaining:
+            yield remaining
+
+    def _stream_ndjson(self, query, field_names) -> Iterator[str]:
+        lines = []
+        for count, row in enumerate(query, start=1):
+            record = {name: _serialize_value(value) for name, value in zip(field_names, row)}
+            lines.append(json.dumps(record))
+            # Flush the first row straight away so clients see data immediately
+            if count == 1 or len(lines) >= self.batch_size:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    def _drain(self, buffer: io.StringIO) -> str:
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return value
+
+
+def _serialize_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _day_after(value: date) -> date:
+    return value + timedelta(days=1)
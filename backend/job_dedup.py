@@ -0,0 +1,124 @@
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import JobOpportunity
+
+MAX_UINT64 = np.iinfo(np.uint64).max
+
+
+def normalize_text(text: str) -> str:
+    text = re.sub(r'\[(hiring|for hire)\]', ' ', (text or '').lower())
+    return re.sub(r'[^a-z0-9]+', ' ', text).strip()
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of title + description, bucketed with LSH for sub-linear lookups"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 4,
+                 threshold: float = 0.7, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be divisible by bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Fixed seed keeps signatures comparable across processes and restarts
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(0, MAX_UINT64, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.randint(0, MAX_UINT64, size=num_perm, dtype=np.uint64)
+
+        # Signatures live in one growable matrix so candidates are compared in a single op
+        self._buckets = defaultdict(list)
+        self._matrix = np.empty((0, num_perm), dtype=np.uint64)
+        self._job_ids: List[int] = []
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def signature(self, title: str, description: str = '') -> np.ndarray:
+        # normalize_text leaves only [a-z0-9 ], so every character is one byte
+        text = normalize_text(f'{title} {description}').encode('ascii')
+        chars = np.frombuffer(text, dtype=np.uint8).astype(np.uint64)
+        if len(chars) < self.shingle_size:
+            chars = np.pad(chars, (0, self.shingle_size - len(chars)))
+
+        # Polynomial hash of every shingle at once, one column per character position;
+        # uint64 arithmetic wraps, so no modulo is needed
+        windows = np.lib.stride_tricks.sliding_window_view(chars, self.shingle_size)
+        hashes = np.zeros(len(windows), dtype=np.uint64)
+        for column in range(self.shingle_size):
+            hashes = hashes * np.uint64(257) + windows[:, column] + np.uint64(1)
+        hashes = np.unique(hashes)
+
+        # Multiply-shift hashing applies every permutation to every shingle at once
+        permuted = (self._a[:, None] * hashes + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1)
+
+    def signature_for_job(self, job: Dict) -> np.ndarray:
+        return self.signature(job.get('title', ''), job.get('description', ''))
+
+    def add(self, job_id: int, signature: np.ndarray):
+        with self._lock:
+            row = len(self._job_ids)
+            if row == len(self._matrix):
+                grown = np.empty((max(1024, row * 2), self.num_perm), dtype=np.uint64)
+                grown[:row] = self._matrix[:row]
+                self._matrix = grown
+            self._matrix[row] = signature
+            self._job_ids.append(job_id)
+            for band_key in self._band_keys(signature):
+                self._buckets[band_key].append(row)
+
+    def find(self, signature: np.ndarray) -> Optional[int]:
+        """Most similar indexed job at or above the threshold, or None"""
+        with self._lock:
+            buckets = [self._buckets[key] for key in self._band_keys(signature) if key in self._buckets]
+            if not buckets:
+                return None
+            rows = np.unique(np.concatenate([np.asarray(bucket, dtype=np.int64) for bucket in buckets]))
+
+            similarities = (self._matrix[rows] == signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._job_ids[rows[best]]
+
+    def ensure_loaded(self):
+        """Index every active canonical job the first time the index is used"""
+        if self._loaded:
+            return
+        with self._load_lock:
+            # Concurrent first requests wait for one load instead of each indexing everything
+            if self._loaded:
+                return
+            rows = JobOpportunity.query.with_entities(
+                JobOpportunity.id, JobOpportunity.title, JobOpportunity.description
+            ).filter(
+                JobOpportunity.is_active == True,
+                JobOpportunity.canonical_job_id.is_(None)
+            ).yield_per(1000)
+            for job_id, title, description in rows:
+                self.add(job_id, self.signature(title, description))
+            self._loaded = True
+
+    def reset(self):
+        """Forget everything so the next lookup rebuilds from the database"""
+        with self._lock:
+            self._buckets.clear()
+            self._matrix = np.empty((0, self.num_perm), dtype=np.uint64)
+            self._job_ids.clear()
+            self._loaded = False
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            start = band * self.rows_per_band
+            yield band, signature[start:start + self.rows_per_band].tobytes()
+
+
+job_dedup_index = NearDuplicateIndex()
@@ -1,14 +1,44 @@
+import json
 import requests
 from bs4 import BeautifulSoup
 import time
 import random
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class JobScraper:
-    def __init__(self):
+    # source -> (url, parser method); parsers are pure so stored payloads can be re-parsed offline
+    SOURCES = {
+        'remoteok': ("https://remoteok.io/remote-freelance-jobs", 'parse_remoteok'),
+        'weworkremotely': ("https://weworkremotely.com/remote-jobs/search?term=freelance", 'parse_weworkremotely'),
+        'reddit': ("https://www.reddit.com/r/forhire.json?limit=10", 'parse_freelancer_reddit'),
+    }
+    
+    def __init__(self, snapshots=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
+        self.snapshots = snapshots
+    
+    def fetch(self, source: str) -> Optional[bytes]:
+        """Download a source's raw payload and keep a snapshot of it"""
+        url = self.SOURCES[source][0]
+        if source == 'reddit':
+            response = requests.get(url, headers={**self.headers, 'User-Agent': 'FreelancerAI/1.0'}, timeout=10)
+        else:
+            response = requests.get(url, headers=self.headers, timeout=10)
+        
+        if response.status_code != 200:
+            return None
+        
+        if self.snapshots is not None:
+            try:
+                self.snapshots.put(source, url, response.content)
+            except OSError as e:
+                print(f"Snapshot write error for {source}: {e}")
+        return response.content
+    
+    def parse(self, source: str, payload: bytes) -> List[Dict]:
+        return getattr(self, self.SOURCES[source][1])(payload)
     
     def scrape_jobs(self) -> List[Dict]:
         """Scrape jobs from various sources"""
@@ -26,107 +56,107 @@ class JobScraper:
     
     def scrape_remoteok(self) -> List[Dict]:
         """Scrape jobs from RemoteOK"""
-        jobs = []
         try:
-            url = "https://remoteok.io/remote-freelance-jobs"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_elements = soup.find_all('tr', class_='job')
-                
-                for job in job_elements[:10]:  # Limit to 10 jobs
-                    try:
-                        title_elem = job.find('h2', class_='title')
-                        company_elem = job.find('h3', class_='company')
-                        
-                        if title_elem and company_elem:
-                            title = title_elem.get_text(strip=True)
-                            company = company_elem.get_text(strip=True)
-                            
-                            jobs.append({
-                                'title': title,
-                                'description': f"Remote freelance position at {company}",
-                                'required_skills': self.extract_skills_from_title(title),
-                                'budget': None,
-                                'source': 'remoteok',
-                                'client_name': company,
-                                'url': f"https://remoteok.io{job.get('data-href', '')}"
-                            })
-                    except Exception as e:
-                        continue
-                        
+            payload = self.fetch('remoteok')
+            return self.parse_remoteok(payload) if payload else []
         except Exception as e:
             print(f"RemoteOK scraping error: {e}")
-            
+            return []
+    
+    def parse_remoteok(self, payload: bytes) -> List[Dict]:
+        jobs = []
+        soup = BeautifulSoup(payload, 'html.parser')
+        job_elements = soup.find_all('tr', class_='job')
+        
+        for job in job_elements[:10]:  # Limit to 10 jobs
+            try:
+                title_elem = job.find('h2', class_='title')
+                company_elem = job.find('h3', class_='company')
+                
+                if title_elem and company_elem:
+                    title = title_elem.get_text(strip=True)
+                    company = company_elem.get_text(strip=True)
+                    
+                    jobs.append({
+                        'title': title,
+                        'description': f"Remote freelance position at {company}",
+                        'required_skills': self.extract_skills_from_title(title),
+                        'budget': None,
+                        'source': 'remoteok',
+                        'client_name': company,
+                        'url': f"https://remoteok.io{job.get('data-href', '')}"
+                    })
+            except Exception as e:
+                continue
+        
         return jobs
     
     def scrape_weworkremotely(self) -> List[Dict]:
         """Scrape jobs from WeWorkRemotely"""
-        jobs = []
         try:
-            url = "https://weworkremotely.com/remote-jobs/search?term=freelance"
-            response = requests.get(url, headers=self.headers, timeout=10)
-            
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                job_elements = soup.find_all('li', class_='feature')
-                
-                for job in job_elements[:5]:  # Limit to 5 jobs
-                    try:
-                        title_elem = job.find('span', class_='title')
-                        company_elem = job.find('span', class_='company')
-                        
-                        if title_elem and company_elem:
-                            title = title_elem.get_text(strip=True)
-                            company = company_elem.get_text(strip=True)
-                            
-                            jobs.append({
-                                'title': title,
-                                'description': f"Remote opportunity with {company}",
-                                'required_skills': self.extract_skills_from_title(title),
-                                'budget': None,
-                                'source': 'weworkremotely',
-                                'client_name': company,
-                                'url': 'https://weworkremotely.com' + job.find('a')['href'] if job.find('a') else None
-                            })
-                    except Exception as e:
-                        continue
-                        
+            payload = self.fetch('weworkremotely')
+            return self.parse_weworkremotely(payload) if payload else []
         except Exception as e:
             print(f"WeWorkRemotely scraping error: {e}")
-            
+            return []
+    
+    def parse_weworkremotely(self, payload: bytes) -> List[Dict]:
+        jobs = []
+        soup = BeautifulSoup(payload, 'html.parser')
+        job_elements = soup.find_all('li', class_='feature')
+        
+        for job in job_elements[:5]:  # Limit to 5 jobs
+            try:
+                title_elem = job.find('span', class_='title')
+                company_elem = job.find('span', class_='company')
+                
+                if title_elem and company_elem:
+                    title = title_elem.get_text(strip=True)
+                    company = company_elem.get_text(strip=True)
+                    
+                    jobs.append({
+                        'title': title,
+                        'description': f"Remote opportunity with {company}",
+                        'required_skills': self.extract_skills_from_title(title),
+                        'budget': None,
+                        'source': 'weworkremotely',
+                        'client_name': company,
+                        'url': 'https://weworkremotely.com' + job.find('a')['href'] if job.find('a') else None
+                    })
+            except Exception as e:
+                continue
+        
         return jobs
     
     def scrape_freelancer_reddit(self) -> List[Dict]:
         """Scrape freelance jobs from Reddit"""
-        jobs = []
         try:
-            url = "https://www.reddit.com/r/forhire.json?limit=10"
-            response = requests.get(url, headers={**self.headers, 'User-Agent': 'FreelancerAI/1.0'})
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                for post in data['data']['children']:
-                    post_data = post['data']
-                    title = post_data.get('title', '')
-                    
-                    # Only get hiring posts
-                    if '[HIRING]' in title.upper():
-                        jobs.append({
-                            'title': title.replace('[HIRING]', '').strip(),
-                            'description': post_data.get('selftext', '')[:300],
-                            'required_skills': self.extract_skills_from_title(title),
-                            'budget': self.extract_budget_from_text(post_data.get('selftext', '')),
-                            'source': 'reddit',
-                            'client_name': post_data.get('author', 'Reddit User'),
-                            'url': f"https://reddit.com{post_data.get('permalink', '')}"
-                        })
-                        
+            payload = self.fetch('reddit')
+            return self.parse_freelancer_reddit(payload) if payload else []
         except Exception as e:
             print(f"Reddit scraping error: {e}")
+            return []
+    
+    def parse_freelancer_reddit(self, payload: bytes) -> List[Dict]:
+        jobs = []
+        data = json.loads(payload)
+        
+        for post in data['data']['children']:
+            post_data = post['data']
+            title = post_data.get('title', '')
             
+            # Only get hiring posts
+            if '[HIRING]' in title.upper():
+                jobs.append({
+                    'title': title.replace('[HIRING]', '').strip(),
+                    'description': post_data.get('selftext', '')[:300],
+                    'required_skills': self.extract_skills_from_title(title),
+                    'budget': self.extract_budget_from_text(post_data.get('selftext', '')),
+                    'source': 'reddit',
+                    'client_name': post_data.get('author', 'Reddit User'),
+                    'url': f"https://reddit.com{post_data.get('permalink', '')}"
+                })
+        
         return jobs
     
     def extract_skills_from_title(self, title: str) -> List[str]:
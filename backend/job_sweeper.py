@@ -0,0 +1,169 @@
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import requests
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.orm import aliased
+
+from __init__ import db
+from models import ArchivedJobOpportunity, JobOpportunity, Proposal, UserJobScore, job_skills
+from response_cache import response_cache
+
+# Listings go stale at different speeds depending on where they were posted
+SOURCE_TTL_DAYS = {
+    'reddit': 14,
+    'remoteok': 30,
+    'weworkremotely': 30,
+}
+
+ARCHIVED_COLUMNS = (
+    'id', 'title', 'description', 'required_skills', 'budget', 'source',
+    'source_url', 'client_name', 'match_score', 'canonical_job_id', 'created_at'
+)
+
+
+class JobSweeper:
+    """Expire stale jobs, move inactive ones to the archive table and purge old archive rows"""
+
+    def __init__(self, batch_size: int = 1000, url_checks_per_run: int = 50):
+        self.batch_size = batch_size
+        self.url_checks_per_run = url_checks_per_run
+        self.default_ttl_days = int(os.getenv('JOB_DEFAULT_TTL_DAYS', '45'))
+        self.retention_days = int(os.getenv('JOB_ARCHIVE_RETENTION_DAYS', '365'))
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+
+    def sweep(self) -> Dict:
+        report = {
+            'expired_by_age': self.expire_by_age(),
+            'expired_by_url': self.expire_removed_urls(),
+            'expired_duplicates': self.expire_orphaned_duplicates(),
+            'archived': self.archive_inactive(),
+            'purged': self.purge_archive()
+        }
+        if any(report.values()):
+            # Bulk statements bypass ORM events, so cached job lists are invalidated here
+            response_cache.bump('jobs')
+        return report
+
+    def expire_by_age(self) -> int:
+        now = datetime.utcnow()
+        expired = 0
+        for source, ttl_days in SOURCE_TTL_DAYS.items():
+            expired += self._deactivate(and_(
+                JobOpportunity.source == source,
+                JobOpportunity.created_at < now - timedelta(days=ttl_days)
+            ))
+
+        expired += self._deactivate(and_(
+            JobOpportunity.source.notin_(list(SOURCE_TTL_DAYS)),
+            JobOpportunity.created_at < now - timedelta(days=self.default_ttl_days)
+        ))
+        return expired
+
+    def expire_removed_urls(self) -> int:
+        """Check a rotating slice of active listings and expire those whose page is gone"""
+        jobs = JobOpportunity.query.filter(
+            JobOpportunity.is_active == True,
+            JobOpportunity.source_url.isnot(None)
+        ).order_by(
+            JobOpportunity.url_checked_at.isnot(None),
+            JobOpportunity.url_checked_at
+        ).limit(self.url_checks_per_run).all()
+
+        expired = 0
+        for job in jobs:
+            job.url_checked_at = datetime.utcnow()
+            if self._url_removed(job.source_url):
+                job.is_active = False
+                expired += 1
+
+        db.session.commit()
+        return expired
+
+    def expire_orphaned_duplicates(self) -> int:
+        """Cross-posts follow their canonical job out of the active set"""
+        canonical = aliased(JobOpportunity)
+        # Ids are read first; MySQL cannot update a table it is selecting from in a subquery
+        ids = [row.id for row in db.session.query(JobOpportunity.id).join(
+            canonical, JobOpportunity.canonical_job_id == canonical.id
+        ).filter(
+            JobOpportunity.is_active == True,
+            canonical.is_active == False
+        )]
+
+        expired = 0
+        for start in range(0, len(ids), self.batch_size):
+            expired += self._deactivate(JobOpportunity.id.in_(ids[start:start + self.batch_size]))
+        return expired
+
+    def archive_inactive(self) -> int:
+        """Copy inactive rows to the archive and delete them, one batch per transaction"""
+        archived = 0
+        while True:
+            ids = self._archivable_ids()
+            if not ids:
+                return archived
+
+            columns = [getattr(JobOpportunity, name) for name in ARCHIVED_COLUMNS]
+            db.session.execute(
+                insert(ArchivedJobOpportunity.__table__).from_select(
+                    list(ARCHIVED_COLUMNS),
+                    select(*columns).where(JobOpportunity.id.in_(ids))
+                )
+            )
+            # The archive keeps required_skills as text, so the normalized links go with the row
+            db.session.execute(delete(job_skills).where(job_skills.c.job_id.in_(ids)))
+            db.session.execute(delete(UserJobScore.__table__).where(UserJobScore.job_id.in_(ids)))
+            db.session.execute(delete(JobOpportunity.__table__).where(JobOpportunity.id.in_(ids)))
+            db.session.commit()
+            archived += len(ids)
+
+    def purge_archive(self) -> int:
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        purged = 0
+        while True:
+            ids = [row.id for row in ArchivedJobOpportunity.query.with_entities(
+                ArchivedJobOpportunity.id
+            ).filter(ArchivedJobOpportunity.archived_at < cutoff).limit(self.batch_size)]
+            if not ids:
+                return purged
+
+            db.session.execute(
+                delete(ArchivedJobOpportunity.__table__).where(ArchivedJobOpportunity.id.in_(ids))
+            )
+            db.session.commit()
+            purged += len(ids)
+
+    def _archivable_ids(self) -> List[int]:
+        # Rows still referenced by proposals or by other jobs stay put (inactive) to keep foreign keys valid
+        has_proposals = select(Proposal.id).where(Proposal.job_id == JobOpportunity.id).exists()
+        duplicate = aliased(JobOpportunity)
+        has_duplicates = select(duplicate.id).where(duplicate.canonical_job_id == JobOpportunity.id).exists()
+
+        rows = db.session.query(JobOpportunity.id).filter(
+            JobOpportunity.is_active == False,
+            ~has_proposals,
+            ~has_duplicates
+        ).order_by(JobOpportunity.id).limit(self.batch_size).all()
+        return [row.id for row in rows]
+
+    def _deactivate(self, condition) -> int:
+        result = db.session.execute(
+            update(JobOpportunity.__table__).where(
+                JobOpportunity.is_active == True,
+                condition
+            ).values(is_active=False)
+        )
+        db.session.commit()
+        return result.rowcount or 0
+
+    def _url_removed(self, url: str) -> bool:
+        try:
+            response = requests.head(url, headers=self.headers, timeout=5, allow_redirects=True)
+            return response.status_code in (404, 410)
+        except requests.RequestException:
+            # Network trouble is not evidence that the listing is gone
+            return False
@@ -0,0 +1,235 @@
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+
+SKILLS = ['Python', 'JavaScript', 'React', 'Node.js', 'Django', 'Flutter', 'SEO', 'Figma', 'PHP', 'AI']
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class FakeGenerativeModel:
+    """Stand-in for Gemini with configurable latency"""
+
+    def __init__(self, latency, jitter):
+        self.latency = latency
+        self.jitter = jitter
+
+    def generate_content(self, prompt, generation_config=None, request_options=None):
+        time.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        if 'match score' in prompt:
+            return FakeResponse(str(random.randint(20, 95)))
+        if 'pricing strategy' in prompt:
+            return FakeResponse('{"recommendation": "Raise rates", "target_rate": 60, "tip": "Niche down"}')
+        return FakeResponse('Thanks for the opportunity. I have shipped similar projects and can start this week.')
+
+
+ROLES = ['developer', 'engineer', 'consultant', 'designer', 'specialist', 'architect', 'freelancer',
+         'contractor', 'expert', 'lead']
+DOMAINS = ['fintech', 'healthcare', 'e-commerce', 'logistics', 'edtech', 'real estate', 'travel', 'gaming',
+           'nonprofit', 'agriculture', 'insurance', 'media', 'legal', 'fitness', 'hospitality', 'energy']
+DELIVERABLES = ['customer portal', 'admin dashboard', 'mobile app', 'REST API', 'landing page', 'data pipeline',
+                'booking system', 'payment integration', 'chatbot', 'reporting module', 'CRM plugin',
+                'inventory tracker', 'marketing site', 'recommendation engine', 'analytics warehouse']
+DETAILS = [
+    'We have an existing codebase that needs cleanup before new features land.',
+    'The first milestone is a working prototype within three weeks.',
+    'You will work directly with our CTO and a small product team.',
+    'Experience with automated testing and CI pipelines is a plus.',
+    'Our users are mostly on mobile so performance matters.',
+    'Please share links to similar work in your application.',
+    'The project may extend into a long-term retainer.',
+    'We need someone comfortable with ambiguous requirements.',
+    'Documentation and a short handover call are expected at the end.',
+    'Timezone overlap with Central Europe is preferred.',
+    'Budget is flexible for the right candidate.',
+    'Accessibility and SEO best practices are required.',
+    'Integration with a legacy SOAP service is part of the scope.',
+    'We already have designs in Figma ready for handoff.',
+    'Security review findings must be addressed as part of this work.',
+    'Weekly demos and async updates in Slack are expected.',
+]
+
+
+class FakeScraper:
+    """Stand-in for the job sources: a handful of fresh synthetic listings per call
+
+    Titles and descriptions are drawn from varied vocabulary so near-duplicate
+    clustering sees realistic, mostly distinct listings.
+    """
+
+    def __init__(self, jobs_per_search):
+        self.jobs_per_search = jobs_per_search
+
+    def scrape_jobs(self):
+        jobs = []
+        for _ in range(self.jobs_per_search):
+            skills = random.sample(SKILLS, 2)
+            domain = random.choice(DOMAINS)
+            deliverable = random.choice(DELIVERABLES)
+            jobs.append({
+                'title': f"{skills[0]} {random.choice(ROLES)} for {domain} {deliverable}",
+                'description': ' '.join([
+                    f"{random.choice(['A', 'Our', 'This'])} {domain} company "
+                    f"{random.choice(['needs a new', 'is hiring to build its', 'wants help with its'])} {deliverable} "
+                    f"built with {skills[0]} and {skills[1]}.",
+                    *random.sample(DETAILS, 3),
+                    f"Reference {uuid.uuid4().hex[:8]}."
+                ]),
+                'required_skills': skills,
+                'budget': float(random.randint(200, 5000)),
+                'source': random.choice(['remoteok', 'weworkremotely', 'reddit']),
+                'client_name': 'Load Test Client',
+                'url': f"https://example.com/jobs/{uuid.uuid4().hex}"
+            })
+        return jobs
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def call(self, name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = method(url, timeout=120, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.latencies[name].append(elapsed)
+            if not ok:
+                self.errors[name] += 1
+        return response if ok else None
+
+    def report(self, wall_time):
+        print(f"\n{'endpoint':<16} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, samples in self.latencies.items():
+            samples = sorted(samples)
+            print(f"{name:<16} {len(samples):>9} {self.errors[name]:>7} {len(samples) / wall_time:>8.1f} "
+                  f"{percentile(samples, 50):>9.1f} {percentile(samples, 95):>9.1f} {percentile(samples, 99):>9.1f}")
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile in milliseconds"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, int(round(pct / 100 * len(sorted_samples))) - 1)
+    return sorted_samples[rank] * 1000
+
+
+def virtual_user(base_url, recorder, iterations):
+    http = requests.Session()
+    credentials = {'email': f"load-{uuid.uuid4().hex}@example.com", 'password': 'loadtest123'}
+
+    registered = recorder.call('register', http.post, f"{base_url}/register", json={
+        **credentials,
+        'full_name': 'Load Test User',
+        'skills': ', '.join(random.sample(SKILLS, 3)),
+        'experience_level': 'intermediate',
+        'hourly_rate': 50.0
+    })
+    if not registered:
+        return
+
+    login = recorder.call('login', http.post, f"{base_url}/login", json=credentials)
+    if not login:
+        return
+    user_id = login.json()['user']['id']
+
+    for _ in range(iterations):
+        recorder.call('search_jobs', http.post, f"{base_url}/jobs/search/{user_id}")
+
+        jobs = recorder.call('get_jobs', http.get, f"{base_url}/jobs/{user_id}")
+        job_list = jobs.json().get('jobs', []) if jobs else []
+        if job_list:
+            recorder.call('proposal', http.post, f"{base_url}/proposals/generate", json={
+                'user_id': user_id,
+                'job_id': random.choice(job_list)['id']
+            })
+
+        recorder.call('analytics', http.get, f"{base_url}/analytics/{user_id}")
+
+
+def start_server(args):
+    """Run the app in-process on SQLite with fake Gemini and job sources"""
+    database_dir = tempfile.mkdtemp(prefix='freelance-loadtest-')
+    os.environ['PRIMARY_DATABASE_URL'] = f"sqlite:///{os.path.join(database_dir, 'loadtest.db')}"
+    os.environ.setdefault('GEMINI_API_KEY', 'loadtest')
+    os.environ.setdefault('PASSWORD_HASH_COST', str(args.hash_cost))
+    # No background workers: the periodic sweeper would send HEAD requests to the synthetic URLs
+    os.environ.setdefault('TASK_WORKERS', '0')
+
+    from werkzeug.serving import make_server
+    from __init__ import create_app, db
+    import routes
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+
+    routes.ai_service.model = FakeGenerativeModel(args.llm_latency, args.llm_jitter)
+    routes.job_scraper = FakeScraper(args.jobs_per_search)
+
+    server = make_server('127.0.0.1', args.port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, database_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Freelance AI Manager API")
+    parser.add_argument('--users', type=int, default=20, help='Number of concurrent virtual users')
+    parser.add_argument('--iterations', type=int, default=5, help='Flows each user runs after logging in')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--base-url', default=None,
+                        help='Test an already running server instead of an in-process one')
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='Mean fake Gemini latency (s)')
+    parser.add_argument('--llm-jitter', type=float, default=0.1)
+    parser.add_argument('--jobs-per-search', type=int, default=5)
+    parser.add_argument('--hash-cost', type=int, default=600000, help='pbkdf2 iterations for the test run')
+    args = parser.parse_args()
+
+    server = None
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+    else:
+        server, database_dir = start_server(args)
+        base_url = f"http://127.0.0.1:{args.port}/api"
+        print(f"🚀 In-process server on {base_url} (SQLite in {database_dir})")
+
+    print(f"👥 {args.users} virtual users x {args.iterations} flows")
+    recorder = Recorder()
+    users = [threading.Thread(target=virtual_user, args=(base_url, recorder, args.iterations))
+             for _ in range(args.users)]
+
+    start = time.perf_counter()
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    wall_time = time.perf_counter() - start
+
+    recorder.report(wall_time)
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    print(f"\n⏱️  {total} requests in {wall_time:.1f}s ({total / wall_time:.1f} req/s overall)")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
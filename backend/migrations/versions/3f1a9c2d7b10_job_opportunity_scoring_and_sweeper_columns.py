@@ -0,0 +1,62 @@
+"""job opportunity dedup, scoring and sweeper columns
+
+Adds the columns and indexes that job_opportunities gained after the initial
+schema (canonical_job_id, url_checked_at, match_score_provisional and their
+indexes). Installs whose tables came from db.create_all() may already have
+some of them, so each step is skipped when the column or index exists.
+
+Revision ID: 3f1a9c2d7b10
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    columns = _columns('job_opportunities')
+    with op.batch_alter_table('job_opportunities') as batch_op:
+        if 'match_score_provisional' not in columns:
+            batch_op.add_column(sa.Column('match_score_provisional', sa.Boolean(), nullable=True,
+                                          server_default=sa.false()))
+        if 'canonical_job_id' not in columns:
+            batch_op.add_column(sa.Column('canonical_job_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key('fk_job_opportunities_canonical_job_id', 'job_opportunities',
+                                        ['canonical_job_id'], ['id'])
+        if 'url_checked_at' not in columns:
+            batch_op.add_column(sa.Column('url_checked_at', sa.DateTime(), nullable=True))
+
+    indexes = _indexes('job_opportunities')
+    if 'ix_job_opportunities_canonical_job_id' not in indexes:
+        op.create_index('ix_job_opportunities_canonical_job_id', 'job_opportunities', ['canonical_job_id'])
+    if 'ix_job_opportunities_created_at' not in indexes:
+        op.create_index('ix_job_opportunities_created_at', 'job_opportunities', ['created_at'])
+    if 'ix_job_opportunities_active_score' not in indexes:
+        op.create_index('ix_job_opportunities_active_score', 'job_opportunities', ['is_active', 'match_score'])
+
+
+def downgrade():
+    op.drop_index('ix_job_opportunities_active_score', table_name='job_opportunities')
+    op.drop_index('ix_job_opportunities_created_at', table_name='job_opportunities')
+    op.drop_index('ix_job_opportunities_canonical_job_id', table_name='job_opportunities')
+    with op.batch_alter_table('job_opportunities') as batch_op:
+        batch_op.drop_constraint('fk_job_opportunities_canonical_job_id', type_='foreignkey')
+        batch_op.drop_column('url_checked_at')
+        batch_op.drop_column('canonical_job_id')
+        batch_op.drop_column('match_score_provisional')
@@ -0,0 +1,35 @@
+"""background task dedupe key
+
+Adds background_tasks.dedupe_key, a unique key held by a pending task that
+must not be enqueued twice (e.g. periodic sweeps). Skipped when the column
+already exists.
+
+Revision ID: 8b2e4d6f1c3a
+Revises: 3f1a9c2d7b10
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1c3a'
+down_revision = '3f1a9c2d7b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('background_tasks')}
+    if 'dedupe_key' in columns:
+        return
+    with op.batch_alter_table('background_tasks') as batch_op:
+        batch_op.add_column(sa.Column('dedupe_key', sa.String(length=100), nullable=True))
+        batch_op.create_unique_constraint('uq_background_tasks_dedupe_key', ['dedupe_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('background_tasks') as batch_op:
+        batch_op.drop_constraint('uq_background_tasks_dedupe_key', type_='unique')
+        batch_op.drop_column('dedupe_key')
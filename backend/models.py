@@ -1,7 +1,71 @@
 from __init__ import db
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import password_hasher
+from sqlalchemy import func, desc, select
+from sqlalchemy.exc import IntegrityError
 import json
+import re
+
+def normalize_skill(skill):
+    return re.sub(r'\s+', ' ', (skill or '').strip().lower())
+
+def parse_skills(skills):
+    """Skill names from a list or a comma-separated string, without blanks or repeats"""
+    if isinstance(skills, str):
+        skills = skills.split(',')
+    names, seen = [], set()
+    for skill in skills or []:
+        name = str(skill).strip()
+        if name and normalize_skill(name) not in seen:
+            seen.add(normalize_skill(name))
+            names.append(name)
+    return names
+
+user_skills = db.Table(
+    'user_skills',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True, index=True)
+)
+
+job_skills = db.Table(
+    'job_skills',
+    db.Column('job_id', db.Integer, db.ForeignKey('job_opportunities.id'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skills.id'), primary_key=True, index=True)
+)
+
+class Skill(db.Model):
+    __tablename__ = 'skills'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    slug = db.Column(db.String(100), unique=True, nullable=False, index=True)  # normalized name
+    
+    @classmethod
+    def get_or_create_many(cls, names):
+        """Skill rows for the given names in the same order, creating missing ones"""
+        names = parse_skills(names)
+        slugs = [normalize_skill(name)[:100] for name in names]
+        if not slugs:
+            return []
+        
+        existing = {skill.slug: skill for skill in cls.query.filter(cls.slug.in_(slugs))}
+        for name, slug in zip(names, slugs):
+            if slug in existing:
+                continue
+            # One savepoint per skill so losing a race only discards that skill's insert
+            try:
+                with db.session.begin_nested():
+                    skill = cls(name=name[:100], slug=slug)
+                    db.session.add(skill)
+                existing[slug] = skill
+            except IntegrityError:
+                # Another request created it first; a locking read sees its committed row
+                existing[slug] = cls.query.filter_by(slug=slug).with_for_update().one()
+        
+        return [existing[slug] for slug in slugs]
+    
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'slug': self.slug}
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -18,15 +82,42 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    skill_set = db.relationship('Skill', secondary=user_skills, lazy='selectin')
+    
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
     
     def get_skills_list(self):
+        if self.skill_set:
+            return [skill.name for skill in self.skill_set]
+        # Rows that have not been backfilled yet still only have the text column
         return [skill.strip() for skill in self.skills.split(',')] if self.skills else []
     
+    def set_skills(self, skills):
+        """Write skills to the normalized tables, keeping the text column in step"""
+        self.skill_set = Skill.get_or_create_many(skills)
+        self.skills = ', '.join(skill.name for skill in self.skill_set)
+    
+    def matching_jobs(self, limit=20):
+        """Active jobs requiring any of this user's skills, most shared skills first"""
+        my_skills = select(user_skills.c.skill_id).where(user_skills.c.user_id == self.id)
+        overlap = func.count(job_skills.c.skill_id).label('skill_overlap')
+        return db.session.query(JobOpportunity, overlap).join(
+            job_skills, job_skills.c.job_id == JobOpportunity.id
+        ).filter(
+            job_skills.c.skill_id.in_(my_skills),
+            JobOpportunity.is_active == True,
+            JobOpportunity.canonical_job_id.is_(None)
+        ).group_by(JobOpportunity.id).order_by(
+            desc(overlap), desc(JobOpportunity.match_score)
+        ).limit(limit).all()
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -42,6 +133,10 @@ class User(db.Model):
 
 class JobOpportunity(db.Model):
     __tablename__ = 'job_opportunities'
+    __table_args__ = (
+        # Hot path: active jobs ordered by match score
+        db.Index('ix_job_opportunities_active_score', 'is_active', 'match_score'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
@@ -52,8 +147,25 @@ class JobOpportunity(db.Model):
     source_url = db.Column(db.String(500), nullable=True)
     client_name = db.Column(db.String(100), nullable=True)
     match_score = db.Column(db.Float, default=0.0)
+    # Local estimate waiting for the AI score to arrive in the background
+    match_score_provisional = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set on near-duplicate cross-posts; points at the job that represents the cluster
+    canonical_job_id = db.Column(db.Integer, db.ForeignKey('job_opportunities.id'), nullable=True, index=True)
+    url_checked_at = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    skill_set = db.relationship('Skill', secondary=job_skills, lazy='select')
+    
+    def get_skills_list(self):
+        if self.skill_set:
+            return [skill.name for skill in self.skill_set]
+        return [skill.strip() for skill in self.required_skills.split(',') if skill.strip()] if self.required_skills else []
+    
+    def set_skills(self, skills):
+        """Write required skills to the normalized tables, keeping the text column in step"""
+        self.skill_set = Skill.get_or_create_many(skills)
+        self.required_skills = ', '.join(skill.name for skill in self.skill_set)
     
     def to_dict(self):
         return {
@@ -66,9 +178,50 @@ class JobOpportunity(db.Model):
             'source_url': self.source_url,
             'client_name': self.client_name,
             'match_score': self.match_score,
+            'match_score_provisional': bool(self.match_score_provisional),
+            'canonical_job_id': self.canonical_job_id,
             'created_at': self.created_at.isoformat()
         }
 
+class UserJobScore(db.Model):
+    """A user's own match score for a job, overriding the shared JobOpportunity.match_score"""
+    __tablename__ = 'user_job_scores'
+    __table_args__ = (
+        db.Index('ix_user_job_scores_user_score', 'user_id', 'score'),
+    )
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job_opportunities.id'), primary_key=True, index=True)
+    score = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ArchivedJobOpportunity(db.Model):
+    __tablename__ = 'job_opportunities_archive'
+    
+    # Same ids as in job_opportunities so archived rows can be traced back
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(255), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    required_skills = db.Column(db.Text, nullable=True)
+    budget = db.Column(db.Float, nullable=True)
+    source = db.Column(db.String(100), nullable=False)
+    source_url = db.Column(db.String(500), nullable=True)
+    client_name = db.Column(db.String(100), nullable=True)
+    match_score = db.Column(db.Float, default=0.0)
+    canonical_job_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'source': self.source,
+            'source_url': self.source_url,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
 class Proposal(db.Model):
     __tablename__ = 'proposals'
     
@@ -208,3 +361,59 @@ class ClientCommunication(db.Model):
             'user_response': self.user_response,
             'created_at': self.created_at.isoformat()
         }
+
+class CommunicationThread(db.Model):
+    __tablename__ = 'communication_threads'
+    __table_args__ = (db.UniqueConstraint('user_id', 'project_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=True)
+    summary = db.Column(db.Text, nullable=True)  # rolling summary of messages up to summarized_through_id
+    summarized_through_id = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'project_id': self.project_id,
+            'summary': self.summary,
+            'summarized_through_id': self.summarized_through_id,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class BackgroundTask(db.Model):
+    __tablename__ = 'background_tasks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_type = db.Column(db.String(100), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    payload = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(50), default='queued', index=True)  # queued, running, succeeded, failed
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+    run_after = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    # Set while a task that must not be duplicated is pending; cleared once it finishes
+    dedupe_key = db.Column(db.String(100), nullable=True, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'task_type': self.task_type,
+            'status': self.status,
+            'result': json.loads(self.result) if self.result else None,
+            'error': self.error,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
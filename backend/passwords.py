@@ -0,0 +1,60 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+SUPPORTED_ALGORITHMS = ('pbkdf2', 'scrypt')
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when hashing could not finish within the wait budget"""
+
+
+class PasswordHasher:
+    """Configurable password hashing run on a bounded pool so logins cannot starve other routes"""
+
+    def __init__(self, algorithm: str = None, cost: int = None, max_workers: int = None):
+        self.algorithm = algorithm or os.getenv('PASSWORD_HASH_ALGORITHM', 'pbkdf2')
+        if self.algorithm not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f'Unsupported password hash algorithm: {self.algorithm}')
+
+        # pbkdf2 cost is the iteration count; scrypt cost is N (a power of two)
+        default_cost = '600000' if self.algorithm == 'pbkdf2' else '32768'
+        self.cost = cost or int(os.getenv('PASSWORD_HASH_COST', default_cost))
+
+        # Half the cores at most, so a login burst leaves CPU for every other route
+        default_workers = max(1, (os.cpu_count() or 2) // 2)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv('PASSWORD_HASH_WORKERS', str(default_workers))),
+            thread_name_prefix='password-hash'
+        )
+        self.max_wait = float(os.getenv('PASSWORD_HASH_MAX_WAIT_SECONDS', '5'))
+
+    @property
+    def method(self) -> str:
+        if self.algorithm == 'pbkdf2':
+            return f'pbkdf2:sha256:{self.cost}'
+        return f'scrypt:{self.cost}:8:1'
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, password_hash: str, password: str) -> bool:
+        return self._run(check_password_hash, password_hash, password)
+
+    def _run(self, func, *args, **kwargs):
+        future = self.executor.submit(func, *args, **kwargs)
+        try:
+            return future.result(timeout=self.max_wait)
+        except TimeoutError:
+            # Drop it if it never started so the queue drains instead of growing
+            future.cancel()
+            raise PasswordHasherBusy('Password hashing is overloaded, try again shortly')
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True when a stored hash was made with a different algorithm or cost"""
+        method = password_hash.split('$', 1)[0]
+        return method != self.method
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,135 @@
+import math
+import textwrap
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+# Per-method limits in tokens; input covers the whole prompt, output caps the reply
+TOKEN_BUDGETS = {
+    'calculate_job_match': {'input': 350, 'output': 10},
+    'generate_proposal': {'input': 450, 'output': 350},
+    'get_pricing_suggestions': {'input': 200, 'output': 200},
+    'analyze_skill_gaps': {'input': 350, 'output': 400},
+    'generate_communication_response': {'input': 600, 'output': 150},
+    'summarize_conversation': {'input': 800, 'output': 200},
+}
+
+DEFAULT_BUDGET = {'input': 500, 'output': 300}
+
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARK = '...'
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate (about four characters per token for English text)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+def get_budget(method: str) -> Dict:
+    return TOKEN_BUDGETS.get(method, DEFAULT_BUDGET)
+
+
+class PromptSection:
+    def __init__(self, text: str, priority: int = 0, items: Optional[List[str]] = None,
+                 separator: str = ', ', prefix: str = ''):
+        self.text = text
+        self.priority = priority
+        self.items = items
+        self.separator = separator
+        self.prefix = prefix
+
+    def render(self) -> str:
+        if self.items is not None:
+            return self.prefix + self.separator.join(self.items)
+        return self.text
+
+    def shrink_to(self, max_tokens: int):
+        """Cut the section down to roughly max_tokens, keeping whole items or words"""
+        if self.items is not None:
+            # Lists lose trailing items rather than being cut mid-item
+            while self.items and estimate_tokens(self.render()) > max_tokens:
+                self.items = self.items[:-1]
+            return
+
+        max_chars = max(0, max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARK))
+        if len(self.text) <= max_chars:
+            return
+        cut = self.text[:max_chars]
+        if ' ' in cut:
+            cut = cut[:cut.rfind(' ')]
+        self.text = cut + TRUNCATION_MARK if cut else ''
+
+
+class PromptBuilder:
+    """Assemble a prompt from prioritized sections and fit it into a token budget"""
+
+    def __init__(self, method: str):
+        self.method = method
+        self.budget = get_budget(method)
+        self.sections: List[PromptSection] = []
+
+    def add(self, text: str, priority: int = 10) -> 'PromptBuilder':
+        """Add a text section; higher priority sections are truncated last"""
+        self.sections.append(PromptSection(textwrap.dedent(text).strip('\n'), priority))
+        return self
+
+    def add_list(self, prefix: str, items: List[str], priority: int = 5,
+                 separator: str = ', ') -> 'PromptBuilder':
+        self.sections.append(PromptSection('', priority, items=list(items),
+                                           separator=separator, prefix=prefix))
+        return self
+
+    def build(self) -> str:
+        """Render the prompt, truncating the lowest-priority sections first when over budget"""
+        limit = self.budget['input']
+        overflow = self.token_count() - limit
+
+        for section in sorted(self.sections, key=lambda s: s.priority):
+            if overflow <= 0:
+                break
+            current = estimate_tokens(section.render())
+            section.shrink_to(max(0, current - overflow))
+            overflow = self.token_count() - limit
+
+        return self.render()
+
+    def render(self) -> str:
+        return '\n'.join(section.render() for section in self.sections)
+
+    def token_count(self) -> int:
+        return estimate_tokens(self.render())
+
+
+class TokenUsageTracker:
+    """Thread-safe running totals of prompt and completion tokens per user and method"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usage = defaultdict(lambda: {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+
+    def record(self, user_id: Optional[int], method: str, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            entry = self._usage[(user_id, method)]
+            entry['calls'] += 1
+            entry['prompt_tokens'] += prompt_tokens
+            entry['completion_tokens'] += completion_tokens
+
+    def summary(self, user_id: Optional[int] = None) -> Dict:
+        """Usage per method, limited to one user when user_id is given"""
+        methods = defaultdict(lambda: {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0})
+        with self._lock:
+            for (entry_user, method), entry in self._usage.items():
+                if user_id is not None and entry_user != user_id:
+                    continue
+                for field, value in entry.items():
+                    methods[method][field] += value
+
+        totals = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+        for entry in methods.values():
+            for field, value in entry.items():
+                totals[field] += value
+
+        return {'methods': dict(methods), 'totals': totals}
+
+
+token_usage = TokenUsageTracker()
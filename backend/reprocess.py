@@ -0,0 +1,133 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+
+from __init__ import db
+from job_scraper import JobScraper
+from models import JobOpportunity, parse_skills
+from snapshot_store import SnapshotStore, snapshot_store
+
+# Parsed fields that map straight onto JobOpportunity columns
+REPROCESSED_FIELDS = ('title', 'description', 'budget', 'client_name', 'required_skills')
+
+
+def parse_snapshot(task: Tuple[str, str, str]) -> List[Dict]:
+    """Re-parse one stored payload; runs in a worker process"""
+    root, digest, source = task
+    payload = SnapshotStore(root).get(digest)
+    return JobScraper().parse(source, payload)
+
+
+class SnapshotReprocessor:
+    """Re-run the scraper parsers over stored snapshots and write back only changed fields"""
+
+    def __init__(self, store: SnapshotStore, workers: int = None, chunk_size: int = 500):
+        self.store = store
+        self.workers = workers or os.cpu_count() or 2
+        self.chunk_size = chunk_size
+
+    def parse_all(self, source: Optional[str] = None) -> Tuple[Dict, Dict]:
+        """Latest parse of every listing, keyed by (source, url)"""
+        report = {'snapshots': 0, 'parse_errors': 0, 'parsed': 0}
+        entries = list(self.store.entries(source=source))
+
+        # A payload fetched several times only needs parsing once
+        unique = list(dict.fromkeys((entry['digest'], entry['source']) for entry in entries))
+        report['snapshots'] = len(unique)
+
+        parsed_by_digest = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            tasks = [(self.store.root, digest, entry_source) for digest, entry_source in unique]
+            futures = [executor.submit(parse_snapshot, task) for task in tasks]
+            for (digest, entry_source), future in zip(unique, futures):
+                try:
+                    parsed_by_digest[(digest, entry_source)] = future.result()
+                except Exception as e:
+                    report['parse_errors'] += 1
+                    print(f"Snapshot {digest} ({entry_source}) failed to parse: {e}")
+
+        # Manifest order makes the newest fetch of a listing win, so reruns are reproducible
+        listings = {}
+        for entry in entries:
+            for job in parsed_by_digest.get((entry['digest'], entry['source']), []):
+                if job.get('url'):
+                    listings[(job['source'], job['url'])] = job
+        report['parsed'] = len(listings)
+        return listings, report
+
+    def run(self, source: Optional[str] = None, dry_run: bool = False) -> Dict:
+        listings, report = self.parse_all(source)
+        report.update({'matched': 0, 'updated': 0, 'fields': Counter()})
+
+        keys = list(listings)
+        for start in range(0, len(keys), self.chunk_size):
+            self._apply_chunk(keys[start:start + self.chunk_size], listings, report, dry_run)
+
+        report['fields'] = dict(report['fields'])
+        return report
+
+    def _apply_chunk(self, keys, listings: Dict, report: Dict, dry_run: bool):
+        sources = {source for source, _ in keys}
+        urls = {url for _, url in keys}
+        jobs = JobOpportunity.query.filter(
+            JobOpportunity.source.in_(sources),
+            JobOpportunity.source_url.in_(urls)
+        ).all()
+
+        for job in jobs:
+            parsed = listings.get((job.source, job.source_url))
+            if parsed is None:
+                continue
+            report['matched'] += 1
+
+            changed = self.changed_fields(job, parsed)
+            if not changed:
+                continue
+            report['updated'] += 1
+            report['fields'].update(changed)
+
+            if dry_run:
+                continue
+            for field in changed:
+                if field == 'required_skills':
+                    job.set_skills(parsed['required_skills'])
+                else:
+                    setattr(job, field, parsed[field])
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+
+    @staticmethod
+    def changed_fields(job: JobOpportunity, parsed: Dict) -> List[str]:
+        changed = []
+        for field in REPROCESSED_FIELDS:
+            if field not in parsed:
+                continue
+            if field == 'required_skills':
+                if parse_skills(parsed[field]) != parse_skills(job.required_skills):
+                    changed.append(field)
+            elif parsed[field] != getattr(job, field):
+                changed.append(field)
+        return changed
+
+
+@click.command('reprocess-snapshots')
+@click.option('--source', default=None, help='Only reprocess one source (remoteok, weworkremotely, reddit)')
+@click.option('--workers', default=None, type=int, help='Parser processes (default: CPU count)')
+@click.option('--dry-run', is_flag=True, help='Report changes without writing them')
+@with_appcontext
+def reprocess_snapshots(source, workers, dry_run):
+    """Re-parse stored scraper snapshots and update jobs whose parsed fields changed"""
+    report = SnapshotReprocessor(snapshot_store, workers=workers).run(source=source, dry_run=dry_run)
+    click.echo(
+        f"{'🔍 Would update' if dry_run else '✅ Updated'} {report['updated']} of {report['matched']} matched jobs "
+        f"from {report['snapshots']} snapshots ({report['parse_errors']} parse errors)"
+    )
+    for field, count in sorted(report['fields'].items()):
+        click.echo(f"   {field}: {count}")
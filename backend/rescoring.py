@@ -0,0 +1,65 @@
+from typing import Dict, List, Set, Tuple
+
+from __init__ import db
+from models import JobOpportunity, User, UserJobScore, normalize_skill
+from skill_index import SkillJobIndex, split_skills
+
+
+class SkillChangeRescorer:
+    """Rescore, for one user only, the jobs touched by a change in their skills"""
+
+    def __init__(self, ai_service, index: SkillJobIndex, max_llm_calls: int = 25,
+                 ambiguous_range: Tuple[float, float] = (35.0, 65.0), chunk_size: int = 500):
+        self.ai_service = ai_service
+        self.index = index
+        self.max_llm_calls = max_llm_calls
+        # Local scores inside this range are close to the 50-point match cut-off, so the AI decides
+        self.ambiguous_range = ambiguous_range
+        self.chunk_size = chunk_size
+
+    def diff(self, old_skills: List[str], new_skills: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Skills added and removed between two skill lists"""
+        old_set = {normalize_skill(skill) for skill in old_skills if skill.strip()}
+        new_set = {normalize_skill(skill) for skill in new_skills if skill.strip()}
+        return new_set - old_set, old_set - new_set
+
+    def rescore(self, user: User, added: Set[str], removed: Set[str]) -> Dict:
+        """Rescore jobs whose required skills intersect the changed skills into the user's own scores"""
+        job_ids = sorted(self.index.jobs_for(added | removed))
+        user_skills = user.get_skills_list()
+        report = {'affected_jobs': len(job_ids), 'rescored_locally': 0, 'rescored_with_ai': 0}
+
+        for start in range(0, len(job_ids), self.chunk_size):
+            chunk_ids = job_ids[start:start + self.chunk_size]
+            jobs = JobOpportunity.query.filter(
+                JobOpportunity.id.in_(chunk_ids),
+                JobOpportunity.is_active == True,
+                JobOpportunity.canonical_job_id.is_(None)
+            ).all()
+            existing = {row.job_id: row for row in UserJobScore.query.filter(
+                UserJobScore.user_id == user.id,
+                UserJobScore.job_id.in_(chunk_ids)
+            )}
+
+            for job in jobs:
+                job_skills = split_skills(job.required_skills)
+                score = self.ai_service.estimate_job_match(user_skills, job_skills)
+
+                low, high = self.ambiguous_range
+                if low <= score <= high and report['rescored_with_ai'] < self.max_llm_calls:
+                    score = self.ai_service.calculate_job_match(
+                        user_skills, job_skills, job.description, user_id=user.id
+                    )
+                    report['rescored_with_ai'] += 1
+                else:
+                    report['rescored_locally'] += 1
+
+                # The shared match_score stays as is; other users never see this score
+                if job.id in existing:
+                    existing[job.id].score = score
+                else:
+                    db.session.add(UserJobScore(user_id=user.id, job_id=job.id, score=score))
+
+            db.session.commit()
+
+        return report
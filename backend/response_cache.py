@@ -0,0 +1,186 @@
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import wraps
+from typing import Iterable, Optional, Tuple
+
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from auth_tokens import current_identity
+from db_routing import force_primary
+from models import JobOpportunity, Project, TimeLog, SkillGap, Proposal, User, UserJobScore
+
+SCOPES_KEY = 'response_cache_scopes'
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses and the version stamps that key them"""
+
+    @abstractmethod
+    def get(self, key):
+        ...
+
+    @abstractmethod
+    def set(self, key, value):
+        ...
+
+    @abstractmethod
+    def get_version(self, scope: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump_version(self, scope: str):
+        ...
+
+    @abstractmethod
+    def bumped_at(self, scope: str) -> float:
+        """Wall-clock time of the scope's last bump, 0 if never bumped"""
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process backend: bounded LRU of responses plus a dict of version stamps"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._bumped_at = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_version(self, scope: str) -> int:
+        with self._lock:
+            return self._versions.get(scope, 0)
+
+    def bump_version(self, scope: str):
+        # Old entries are never read again once the stamp moves and age out of the LRU
+        with self._lock:
+            self._versions[scope] = self._versions.get(scope, 0) + 1
+            self._bumped_at[scope] = time.time()
+
+    def bumped_at(self, scope: str) -> float:
+        with self._lock:
+            return self._bumped_at.get(scope, 0.0)
+
+
+class ResponseCache:
+    """Cache JSON read endpoints keyed by (route, user, version stamps) and serve ETags"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend or LRUCacheBackend()
+        self.replica_lag_seconds = float(os.getenv('REPLICA_LAG_SECONDS', '5'))
+
+    def init_app(self, app):
+        backend = app.config.get('RESPONSE_CACHE_BACKEND')
+        if backend is not None:
+            self.backend = backend
+        else:
+            self.backend = LRUCacheBackend(int(os.getenv('RESPONSE_CACHE_SIZE', '1024')))
+        self.replica_lag_seconds = float(os.getenv('REPLICA_LAG_SECONDS', '5'))
+
+    def cached(self, *scopes: str):
+        """Cache a user-scoped GET route; scopes may reference {user_id}"""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                user_id = kwargs.get('user_id')
+                # Only the owner may be served from cache; anyone else gets the view's 401
+                identity = current_identity()
+                if user_id is None or identity is None or identity.id != user_id:
+                    return view(*args, **kwargs)
+
+                user_scopes = [scope.format(user_id=user_id) for scope in scopes]
+                stamps = self.stamps(user_scopes)
+                key = (request.endpoint, user_id, request.full_path, stamps)
+
+                entry = self.backend.get(key)
+                if entry is None:
+                    # A replica may not have the write behind a recent bump yet; filling the
+                    # entry from it would pin the stale body under the new stamp
+                    if self.recently_bumped(user_scopes):
+                        force_primary()
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = (etag_for(body), body, response.mimetype)
+                    self.backend.set(key, entry)
+
+                etag, body, mimetype = entry
+                if request.if_none_match.contains(etag):
+                    response = Response(status=304)
+                else:
+                    response = Response(body, status=200, mimetype=mimetype)
+                response.set_etag(etag)
+                response.headers['Cache-Control'] = 'private, no-cache'
+                return response
+            return wrapper
+        return decorator
+
+    def stamps(self, scopes: Iterable[str]) -> Tuple:
+        return tuple((scope, self.backend.get_version(scope)) for scope in scopes)
+
+    def recently_bumped(self, scopes: Iterable[str]) -> bool:
+        cutoff = time.time() - self.replica_lag_seconds
+        return any(self.backend.bumped_at(scope) > cutoff for scope in scopes)
+
+    def bump(self, *scopes: str):
+        for scope in scopes:
+            self.backend.bump_version(scope)
+
+
+def etag_for(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+response_cache = ResponseCache()
+
+
+def track_writes(model, scope_for):
+    """Bump the scopes returned by scope_for(row) once a transaction writing model commits"""
+    def collect(mapper, connection, target):
+        row_session = object_session(target)
+        if row_session is not None:
+            row_session.info.setdefault(SCOPES_KEY, set()).add(scope_for(target))
+
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        event.listen(model, event_name, collect)
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed_scopes(db_session):
+    scopes = db_session.info.pop(SCOPES_KEY, None)
+    if scopes:
+        response_cache.bump(*scopes)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back_scopes(db_session, previous_transaction):
+    db_session.info.pop(SCOPES_KEY, None)
+
+
+# Jobs are shared by every user; everything else is versioned per owner
+track_writes(JobOpportunity, lambda row: 'jobs')
+# User.set_skills always rewrites users.skills, so any skills change lands here
+track_writes(User, lambda row: f'skills:{row.id}')
+for _model, _name in ((Project, 'projects'), (TimeLog, 'time_logs'), (SkillGap, 'skill_gaps'),
+                      (Proposal, 'proposals'), (UserJobScore, 'job_scores')):
+    track_writes(_model, lambda row, name=_name: f'{name}:{row.user_id}')
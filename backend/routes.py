@@ -1,30 +1,59 @@
 # routes.py - Updated with proper session management and fixes
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, request, jsonify, session, Response, stream_with_context, current_app, g
 from flask_cors import cross_origin
 # Import all required models
-from models import User, JobOpportunity, Proposal, Project, TimeLog, SkillGap, ClientCommunication
+from models import (User, JobOpportunity, Proposal, Project, TimeLog, SkillGap, ClientCommunication,
+                    CommunicationThread, BackgroundTask, UserJobScore)
 from __init__ import db
 
 # Import AI services
 from ai_services import AIService
 from job_scraper import JobScraper
+from snapshot_store import snapshot_store
+from bulk_ingest import BulkJobIngestor
+from exports import DataExporter
+from analytics import TimeSeriesAnalytics, timeseries_analytics
+from prompt_budget import token_usage
+from task_queue import task_queue
+from response_cache import response_cache
+from communications import CommunicationService
+from job_dedup import job_dedup_index
+from skill_index import skill_job_index
+from rescoring import SkillChangeRescorer
+from job_sweeper import JobSweeper
+from skill_matcher import skill_matcher
+from db_routing import read_only
+from passwords import PasswordHasherBusy
+from auth_tokens import access_tokens, current_identity
+from dashboard import DashboardAggregator, select_fields
 
 # Initialize services
 ai_service = AIService()
-job_scraper = JobScraper()
+job_scraper = JobScraper(snapshot_store)
+bulk_ingestor = BulkJobIngestor()
+data_exporter = DataExporter()
+communication_service = CommunicationService(ai_service)
+skill_rescorer = SkillChangeRescorer(ai_service, skill_job_index)
+job_sweeper = JobSweeper()
+dashboard = DashboardAggregator()
 
 import os
+import json
 from datetime import datetime, timedelta
-from sqlalchemy import func, desc
+from sqlalchemy import func, desc, or_, and_
 
 main = Blueprint('main', __name__)
 
 # Helper function to check authentication
 def require_auth():
-    """Check if user is authenticated"""
-    if 'user_id' not in session:
-        return None
-    return User.query.get(session['user_id'])
+    """Caller's identity from a signed access token or the session, without a database lookup"""
+    return current_identity()
+
+def load_current_user():
+    """The authenticated user's row, fetched at most once per request"""
+    if 'current_user' not in g:
+        g.current_user = User.query.get_or_404(require_auth().id)
+    return g.current_user
 
 # Basic Routes
 @main.route('/test', methods=['GET'])
@@ -71,10 +100,10 @@ def register():
         user = User(
             email=email,
             full_name=full_name,
-            skills=data.get('skills', ''),
             experience_level=data.get('experience_level', 'beginner'),
             hourly_rate=data.get('hourly_rate', 0.0)
         )
+        user.set_skills(data.get('skills', ''))
         user.set_password(password)
         
         db.session.add(user)
@@ -85,6 +114,10 @@ def register():
             'user_id': user.id
         }), 201
         
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'detail': str(e)}), 503, {'Retry-After': '1'}
+        
     except Exception as e:
         db.session.rollback()
         return jsonify({'detail': f'Registration failed: {str(e)}'}), 500
@@ -106,18 +139,28 @@ def login():
         user = User.query.filter_by(email=email).first()
         
         if user and user.check_password(password):
+            # Upgrade hashes made with older algorithm/cost settings while we know the password
+            if user.password_needs_rehash():
+                user.set_password(password)
+                db.session.commit()
+            
             session['user_id'] = user.id
             session.permanent = True  # Make session permanent
             
             # Return format expected by frontend
             return jsonify({
-                'access_token': f'session_{user.id}',  # Fake token for frontend
+                'access_token': access_tokens.issue(user),
                 'token_type': 'bearer',
+                'expires_in': access_tokens.max_age,
                 'user': user.to_dict()
             }), 200
         else:
             return jsonify({'detail': 'Incorrect email or password'}), 401
             
+    except PasswordHasherBusy as e:
+        db.session.rollback()
+        return jsonify({'detail': str(e)}), 503, {'Retry-After': '1'}
+        
     except Exception as e:
         return jsonify({'detail': f'Login failed: {str(e)}'}), 500
 
@@ -127,6 +170,188 @@ def logout():
     session.clear()
     return jsonify({'message': 'Logged out successfully'}), 200
 
+def wants_async():
+    """Long-running routes run as background tasks when called with ?async=true"""
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+def task_accepted(task):
+    return jsonify({
+        'task_id': task.id,
+        'status': task.status,
+        'status_url': f'/api/tasks/{task.id}'
+    }), 202
+
+def run_job_search(user):
+    """Scrape sources, store unseen jobs with match scores and return the high matches"""
+    # Scrape new jobs
+    new_jobs = job_scraper.scrape_jobs()
+    
+    # Store jobs in database and calculate match scores
+    job_dedup_index.ensure_loaded()
+    to_score = []
+    cross_posts = []
+    for job_data in new_jobs:
+        # Check if job already exists
+        existing_job = JobOpportunity.query.filter_by(
+            title=job_data['title'],
+            source=job_data['source']
+        ).first()
+        
+        if not existing_job:
+            signature = job_dedup_index.signature_for_job(job_data)
+            canonical_id = job_dedup_index.find(signature)
+            canonical = JobOpportunity.query.get(canonical_id) if canonical_id else None
+            
+            job = JobOpportunity(
+                title=job_data['title'],
+                description=job_data['description'],
+                budget=job_data.get('budget'),
+                source=job_data['source'],
+                source_url=job_data.get('url'),
+                client_name=job_data.get('client_name'),
+                canonical_job_id=canonical.id if canonical else None
+            )
+            job.set_skills(job_data['required_skills'])
+            
+            db.session.add(job)
+            
+            if canonical:
+                cross_posts.append((job, canonical))
+            else:
+                db.session.flush()
+                job_dedup_index.add(job.id, signature)
+                to_score.append((job, job_data))
+    
+    # Calculate match scores using AI; every call is in flight at once under one latency budget
+    scorings = ai_service.calculate_job_matches_within(
+        user.get_skills_list(),
+        [(job_data['required_skills'], job_data['description']) for _, job_data in to_score],
+        user_id=user.id
+    )
+    
+    matched_jobs = []
+    pending_scores = []
+    for (job, _), scoring in zip(to_score, scorings):
+        job.match_score = scoring.value
+        job.match_score_provisional = scoring.provisional
+        if scoring.provisional:
+            pending_scores.append((job.id, scoring))
+        
+        if job.match_score > 50:  # Only return high-match jobs
+            matched_jobs.append(job)
+    
+    for job, canonical in cross_posts:
+        # Cross-post of a known job: reuse its score instead of asking the AI again
+        job.match_score = canonical.match_score
+        job.match_score_provisional = canonical.match_score_provisional
+    
+    try:
+        db.session.commit()
+    except Exception:
+        # Ids already added to the index belong to rows that were never stored
+        job_dedup_index.reset()
+        raise
+    
+    # Late AI answers overwrite the provisional scores once the rows are committed
+    app = current_app._get_current_object()
+    for job_id, scoring in pending_scores:
+        scoring.then(lambda score, job_id=job_id: store_refined_job_score(app, job_id, score))
+    
+    return {
+        'jobs': [job.to_dict() for job in matched_jobs],
+        'total_found': len(new_jobs),
+        'high_match_jobs': len(matched_jobs)
+    }
+
+def store_refined_job_score(app, job_id, score):
+    """Replace a provisional match score, including on the job's cross-posts"""
+    with app.app_context():
+        JobOpportunity.query.filter(
+            or_(JobOpportunity.id == job_id, JobOpportunity.canonical_job_id == job_id)
+        ).update({'match_score': score, 'match_score_provisional': False}, synchronize_session=False)
+        db.session.commit()
+        response_cache.bump('jobs')
+
+@task_queue.handler('search_jobs')
+def search_jobs_task(payload):
+    user = User.query.get(payload['user_id'])
+    if not user:
+        raise ValueError(f"User {payload['user_id']} not found")
+    return run_job_search(user)
+
+# Profile Routes
+PROFILE_FIELDS = ('full_name', 'skills', 'experience_level', 'hourly_rate', 'portfolio_url', 'bio')
+
+@task_queue.handler('rescore_skill_change')
+def rescore_skill_change_task(payload):
+    user = User.query.get(payload['user_id'])
+    if not user:
+        raise ValueError(f"User {payload['user_id']} not found")
+    return skill_rescorer.rescore(user, set(payload['added']), set(payload['removed']))
+
+@main.route('/users/<int:user_id>', methods=['PUT'])
+@cross_origin()
+def update_profile(user_id):
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        data = request.get_json()
+        if not data:
+            return jsonify({'detail': 'No data provided'}), 400
+
+        user = load_current_user()
+        old_skills = user.get_skills_list()
+
+        for field in PROFILE_FIELDS:
+            if field == 'skills' and field in data:
+                user.set_skills(data[field])
+            elif field in data:
+                setattr(user, field, data[field])
+        db.session.commit()
+
+        response = {'message': 'Profile updated successfully', 'user': user.to_dict()}
+
+        # Only jobs touching the changed skills are rescored, in the background
+        added, removed = skill_rescorer.diff(old_skills, user.get_skills_list())
+        if added or removed:
+            task = task_queue.enqueue('rescore_skill_change', {
+                'user_id': user_id,
+                'added': sorted(added),
+                'removed': sorted(removed)
+            }, user_id=user_id)
+            response['rescore_task_id'] = task.id
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Profile update failed: {str(e)}'}), 500
+
+@task_queue.handler('sweep_jobs')
+def sweep_jobs_task(payload):
+    report = job_sweeper.sweep()
+    if report['archived']:
+        # Archived canonical ids must not be handed out as cluster heads any more
+        job_dedup_index.reset()
+    return report
+
+task_queue.periodic('sweep_jobs', int(os.getenv('JOB_SWEEP_INTERVAL', '3600')))
+
+@dashboard.section('jobs')
+def top_jobs(user_id):
+    """Active canonical jobs with high match scores, using the user's own scores where rescored"""
+    score = func.coalesce(UserJobScore.score, JobOpportunity.match_score)
+    rows = db.session.query(JobOpportunity, score).outerjoin(
+        UserJobScore, and_(UserJobScore.job_id == JobOpportunity.id, UserJobScore.user_id == user_id)
+    ).filter(
+        score > 50,
+        JobOpportunity.is_active == True,
+        JobOpportunity.canonical_job_id.is_(None)
+    ).order_by(desc(score)).limit(20).all()
+    return [{**job.to_dict(), 'match_score': job_score} for job, job_score in rows]
+
 # FIXED: Add authentication check to all protected routes
 @main.route('/jobs/search/<int:user_id>', methods=['POST'])  # Changed to POST to match frontend
 @cross_origin()
@@ -135,78 +360,140 @@ def search_jobs(user_id):
         current_user = require_auth()
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
-            
-        user = User.query.get_or_404(user_id)
         
-        # Scrape new jobs
-        new_jobs = job_scraper.scrape_jobs()
-        
-        # Store jobs in database and calculate match scores
-        matched_jobs = []
-        for job_data in new_jobs:
-            # Check if job already exists
-            existing_job = JobOpportunity.query.filter_by(
-                title=job_data['title'],
-                source=job_data['source']
-            ).first()
+        if wants_async():
+            return task_accepted(task_queue.enqueue('search_jobs', {'user_id': user_id}, user_id=user_id))
             
-            if not existing_job:
-                # Calculate match score using AI
-                match_score = ai_service.calculate_job_match(
-                    user.get_skills_list(),
-                    job_data['required_skills'],
-                    job_data['description']
-                )
-                
-                job = JobOpportunity(
-                    title=job_data['title'],
-                    description=job_data['description'],
-                    required_skills=', '.join(job_data['required_skills']),
-                    budget=job_data.get('budget'),
-                    source=job_data['source'],
-                    source_url=job_data.get('url'),
-                    client_name=job_data.get('client_name'),
-                    match_score=match_score
-                )
-                
-                db.session.add(job)
-                
-                if match_score > 50:  # Only return high-match jobs
-                    matched_jobs.append(job.to_dict())
-        
-        db.session.commit()
+        user = load_current_user()
         
-        return jsonify({
-            'jobs': matched_jobs,
-            'total_found': len(new_jobs),
-            'high_match_jobs': len(matched_jobs)
-        }), 200
+        return jsonify(run_job_search(user)), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'detail': f'Job search failed: {str(e)}'}), 500
 
 @main.route('/jobs/<int:user_id>', methods=['GET'])
 @cross_origin()
+@read_only
+@response_cache.cached('jobs', 'job_scores:{user_id}')
 def get_jobs(user_id):
     try:
         current_user = require_auth()
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
             
-        # Get jobs with high match scores
-        jobs = JobOpportunity.query.filter(
-            JobOpportunity.match_score > 50,
-            JobOpportunity.is_active == True
-        ).order_by(desc(JobOpportunity.match_score)).limit(20).all()
-        
         return jsonify({
-            'jobs': [job.to_dict() for job in jobs]
+            'jobs': top_jobs(user_id)
         }), 200
         
     except Exception as e:
         return jsonify({'detail': f'Failed to get jobs: {str(e)}'}), 500
 
+@main.route('/jobs/<int:user_id>/matches', methods=['GET'])
+@cross_origin()
+def get_skill_matches(user_id):
+    """Rank the active catalogue by skill overlap without any AI calls"""
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        min_budget = request.args.get('min_budget', type=float)
+        source = request.args.get('source')
+
+        matches = skill_matcher.match(
+            load_current_user().get_skills_list(), limit=limit, min_budget=min_budget, source=source
+        )
+
+        jobs = {job.id: job for job in JobOpportunity.query.filter(
+            JobOpportunity.id.in_([match['job_id'] for match in matches])
+        )} if matches else {}
+
+        results = []
+        for match in matches:
+            job = jobs.get(match['job_id'])
+            if job:
+                results.append({
+                    **job.to_dict(),
+                    'skill_overlap': match['skill_overlap'],
+                    'skill_coverage': match['skill_coverage']
+                })
+
+        return jsonify({'jobs': results}), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Failed to match jobs: {str(e)}'}), 500
+
+@main.route('/jobs/<int:user_id>/by-skills', methods=['GET'])
+@cross_origin()
+@read_only
+@response_cache.cached('jobs', 'skills:{user_id}')
+def get_jobs_by_skills(user_id):
+    """Active jobs requiring any of the user's skills, ordered by how many they share"""
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        limit = min(request.args.get('limit', 20, type=int), 100)
+
+        return jsonify({
+            'jobs': [
+                {**job.to_dict(), 'skill_overlap': overlap}
+                for job, overlap in load_current_user().matching_jobs(limit=limit)
+            ]
+        }), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Failed to get jobs: {str(e)}'}), 500
+
+@main.route('/jobs/bulk', methods=['POST'])
+@cross_origin()
+def bulk_ingest_jobs():
+    """Ingest newline-delimited JSON jobs from an external feed"""
+    try:
+        # Feeds write shared job rows, so a user session is not enough
+        if not bulk_ingestor.accepts(request.headers.get('X-Feed-Token')):
+            return jsonify({'detail': 'A valid X-Feed-Token header is required'}), 403
+
+        # Read the body line by line so large feeds are never held in memory
+        report = bulk_ingestor.ingest(request.stream)
+
+        status = 200 if report['error_count'] == 0 else 207
+        return jsonify(report), status
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Bulk ingestion failed: {str(e)}'}), 500
+
 # Proposal Routes
+def create_proposal(user, job):
+    """Draft a proposal for one job with AI and store it"""
+    # Generate AI proposal
+    proposal_content = ai_service.generate_proposal(
+        user.to_dict(),
+        job.to_dict()
+    )
+    
+    proposal = Proposal(
+        user_id=user.id,
+        job_id=job.id,
+        content=proposal_content
+    )
+    
+    db.session.add(proposal)
+    db.session.commit()
+    return proposal
+
+@task_queue.handler('generate_proposal')
+def generate_proposal_task(payload):
+    user = User.query.get(payload['user_id'])
+    job = JobOpportunity.query.get(payload['job_id'])
+    if not user or not job:
+        raise ValueError('User or job not found')
+    return {'proposal': create_proposal(user, job).to_dict()}
+
 @main.route('/proposals/generate', methods=['POST'])
 @cross_origin()
 def generate_proposal():
@@ -219,23 +506,15 @@ def generate_proposal():
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
         
-        user = User.query.get_or_404(user_id)
+        user = load_current_user()
         job = JobOpportunity.query.get_or_404(job_id)
         
-        # Generate AI proposal
-        proposal_content = ai_service.generate_proposal(
-            user.to_dict(),
-            job.to_dict()
-        )
-        
-        proposal = Proposal(
-            user_id=user_id,
-            job_id=job_id,
-            content=proposal_content
-        )
+        if wants_async():
+            return task_accepted(task_queue.enqueue(
+                'generate_proposal', {'user_id': user_id, 'job_id': job_id}, user_id=user_id
+            ))
         
-        db.session.add(proposal)
-        db.session.commit()
+        proposal = create_proposal(user, job)
         
         return jsonify({
             'message': 'Proposal generated successfully',
@@ -246,89 +525,461 @@ def generate_proposal():
         db.session.rollback()
         return jsonify({'detail': f'Proposal generation failed: {str(e)}'}), 500
 
+PROPOSAL_BATCH_LIMIT = 50
+PROPOSAL_BATCH_CONCURRENCY = int(os.getenv('PROPOSAL_BATCH_CONCURRENCY', '5'))
+
+@main.route('/proposals/batch', methods=['POST'])
+@cross_origin()
+def generate_proposals_batch():
+    """Draft proposals for several jobs at once, streaming each draft as it is ready"""
+    try:
+        data = request.get_json() or {}
+        user_id = data.get('user_id')
+        job_ids = data.get('job_ids')
+        top_n = data.get('top_n')
+
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        if job_ids:
+            if not isinstance(job_ids, list):
+                return jsonify({'detail': 'job_ids must be a list'}), 400
+            jobs = JobOpportunity.query.filter(
+                JobOpportunity.id.in_(job_ids[:PROPOSAL_BATCH_LIMIT])
+            ).all()
+        elif top_n:
+            # Best matches the user has not already sent a proposal for
+            proposed = db.session.query(Proposal.job_id).filter(Proposal.user_id == user_id)
+            jobs = JobOpportunity.query.filter(
+                JobOpportunity.is_active == True,
+                JobOpportunity.canonical_job_id.is_(None),
+                ~JobOpportunity.id.in_(proposed)
+            ).order_by(desc(JobOpportunity.match_score)).limit(
+                min(int(top_n), PROPOSAL_BATCH_LIMIT)
+            ).all()
+        else:
+            return jsonify({'detail': 'Provide job_ids or top_n'}), 400
+
+        if not jobs:
+            return jsonify({'detail': 'No matching jobs found'}), 404
+
+        user_data = load_current_user().to_dict()
+        job_data = [job.to_dict() for job in jobs]
+
+        def generate():
+            drafts = []
+            for job, content in ai_service.generate_proposals_batch(
+                user_data, job_data, max_concurrency=PROPOSAL_BATCH_CONCURRENCY
+            ):
+                drafts.append((job, content))
+                yield json.dumps({
+                    'job_id': job['id'],
+                    'job_title': job['title'],
+                    'content': content
+                }) + '\n'
+
+            # All drafts are stored together once generation finishes
+            try:
+                proposals = [
+                    Proposal(user_id=user_id, job_id=job['id'], content=content)
+                    for job, content in drafts
+                ]
+                db.session.add_all(proposals)
+                db.session.commit()
+                yield json.dumps({
+                    'done': True,
+                    'proposals': [proposal.to_dict() for proposal in proposals]
+                }) + '\n'
+            except Exception as e:
+                db.session.rollback()
+                yield json.dumps({'done': True, 'detail': f'Saving proposals failed: {str(e)}'}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson', status=201)
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Batch proposal generation failed: {str(e)}'}), 500
+
+@dashboard.section('projects')
+def user_projects(user_id):
+    projects = Project.query.filter_by(user_id=user_id).order_by(desc(Project.created_at)).all()
+    return [project.to_dict() for project in projects]
+
 @main.route('/projects/<int:user_id>', methods=['GET'])
 @cross_origin()
+@read_only
+@response_cache.cached('projects:{user_id}')
 def get_user_projects(user_id):
     try:
         current_user = require_auth()
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
             
-        projects = Project.query.filter_by(user_id=user_id).order_by(desc(Project.created_at)).all()
         return jsonify({
-            'projects': [project.to_dict() for project in projects]
+            'projects': user_projects(user_id)
         }), 200
         
     except Exception as e:
         return jsonify({'detail': f'Failed to get projects: {str(e)}'}), 500
 
 # Analytics Routes
+@dashboard.section('analytics')
+def earnings_summary(user_id):
+    """Lifetime earnings, hours, average rate and active project count"""
+    # Get earnings summary
+    total_earnings = db.session.query(func.sum(Project.budget)).filter_by(
+        user_id=user_id, status='completed'
+    ).scalar() or 0
+    
+    total_hours = db.session.query(func.sum(Project.hours_worked)).filter_by(
+        user_id=user_id
+    ).scalar() or 0
+    
+    avg_hourly_rate = total_earnings / total_hours if total_hours > 0 else 0
+    
+    # Get active projects count
+    active_projects = Project.query.filter_by(user_id=user_id, status='active').count()
+    
+    return {
+        'total_earnings': float(total_earnings),
+        'total_hours': float(total_hours),
+        'average_hourly_rate': round(avg_hourly_rate, 2),
+        'active_projects': active_projects
+    }
+
+# Pricing answers that arrived after their request had already returned a provisional one
+refined_pricing = {}
+
+def pricing_inputs(summary):
+    return (summary['total_earnings'], summary['total_hours'], summary['average_hourly_rate'])
+
+def store_refined_pricing(user_id, inputs, suggestion):
+    refined_pricing[user_id] = (inputs, suggestion)
+    response_cache.bump(f'pricing:{user_id}')
+
+def stored_pricing(user_id, summary):
+    """Pricing answer already stored for these exact earnings, if any"""
+    refined = refined_pricing.get(user_id)
+    if refined and refined[0] == pricing_inputs(summary):
+        return refined[1]
+    return None
+
+def pricing_suggestion_for(user_id, summary, within_deadline=True):
+    # AI-powered pricing suggestions
+    inputs = pricing_inputs(summary)
+    stored = stored_pricing(user_id, summary)
+    if stored is not None:
+        return stored
+    
+    if not within_deadline:
+        return ai_service.get_pricing_suggestions(user_id, *inputs)
+    
+    pricing = ai_service.get_pricing_suggestions_within(user_id, *inputs)
+    if not pricing.provisional:
+        return pricing.value
+    
+    pricing.then(lambda suggestion: store_refined_pricing(user_id, inputs, suggestion))
+    return {**pricing.value, 'provisional': True}
+
+@dashboard.section('pricing', deferred=True)
+def pricing_section(user_id):
+    # Bounded by the pricing deadline; a late answer refines the cached analytics later
+    return pricing_suggestion_for(user_id, earnings_summary(user_id))
+
+@task_queue.handler('pricing_suggestions')
+def pricing_suggestions_task(payload):
+    user_id = payload['user_id']
+    summary = earnings_summary(user_id)
+    suggestion = pricing_suggestion_for(user_id, summary, within_deadline=False)
+    # Later dashboard and analytics loads reuse the answer instead of asking the model again
+    store_refined_pricing(user_id, pricing_inputs(summary), suggestion)
+    return {'summary': summary, 'pricing_suggestion': suggestion}
+
 @main.route('/analytics/<int:user_id>', methods=['GET'])
 @cross_origin()
+@read_only
+@response_cache.cached('projects:{user_id}', 'pricing:{user_id}')
 def get_analytics(user_id):
     try:
         current_user = require_auth()
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
             
-        # Get earnings summary
-        total_earnings = db.session.query(func.sum(Project.budget)).filter_by(
-            user_id=user_id, status='completed'
-        ).scalar() or 0
-        
-        total_hours = db.session.query(func.sum(Project.hours_worked)).filter_by(
-            user_id=user_id
-        ).scalar() or 0
+        summary = earnings_summary(user_id)
         
-        avg_hourly_rate = total_earnings / total_hours if total_hours > 0 else 0
-        
-        # Get active projects count
-        active_projects = Project.query.filter_by(user_id=user_id, status='active').count()
-        
-        # AI-powered pricing suggestions
-        try:
-            pricing_suggestion = ai_service.get_pricing_suggestions(
-                user_id, total_earnings, total_hours, avg_hourly_rate
-            )
-        except:
-            pricing_suggestion = {
-                'recommendation': 'Based on your experience, consider reviewing market rates',
-                'target_rate': max(avg_hourly_rate * 1.1, 25),
-                'tip': 'Focus on building a strong portfolio to justify higher rates'
-            }
+        if wants_async():
+            # Summary is cheap and returned now; the pricing call is polled via the task
+            task = task_queue.enqueue('pricing_suggestions', {'user_id': user_id}, user_id=user_id,
+                                      dedupe_key=f'pricing:{user_id}')
+            return jsonify({
+                'summary': summary,
+                'pricing_suggestion': None,
+                'task_id': task.id,
+                'status_url': f'/api/tasks/{task.id}'
+            }), 202
         
         return jsonify({
-            'summary': {
-                'total_earnings': float(total_earnings),
-                'total_hours': float(total_hours),
-                'average_hourly_rate': round(avg_hourly_rate, 2),
-                'active_projects': active_projects
-            },
-            'pricing_suggestion': pricing_suggestion
+            'summary': summary,
+            'pricing_suggestion': pricing_suggestion_for(user_id, summary)
         }), 200
         
     except Exception as e:
         return jsonify({'detail': f'Analytics failed: {str(e)}'}), 500
 
+@main.route('/analytics/<int:user_id>/timeseries', methods=['GET'])
+@cross_origin()
+@response_cache.cached('projects:{user_id}', 'time_logs:{user_id}')
+def get_analytics_timeseries(user_id):
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        period = request.args.get('period', 'month')
+        group_by = request.args.get('group_by', 'project')
+
+        if period not in TimeSeriesAnalytics.PERIODS:
+            return jsonify({'detail': 'period must be week or month'}), 400
+        if group_by not in TimeSeriesAnalytics.GROUPINGS:
+            return jsonify({'detail': 'group_by must be project or client'}), 400
+
+        return jsonify(timeseries_analytics.compute(user_id, period, group_by)), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Time-series analytics failed: {str(e)}'}), 500
+
+@main.route('/analytics/<int:user_id>/ai-usage', methods=['GET'])
+@cross_origin()
+def get_ai_usage(user_id):
+    """Prompt and completion token usage per AI method for a user"""
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        return jsonify(token_usage.summary(user_id)), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Failed to get AI usage: {str(e)}'}), 500
+
 # Skill Gap Analysis Routes
+@dashboard.section('skill_gaps')
+def user_skill_gaps(user_id):
+    gaps = SkillGap.query.filter_by(user_id=user_id).order_by(desc(SkillGap.priority_score)).all()
+    return [gap.to_dict() for gap in gaps]
+
 @main.route('/skill-gaps/<int:user_id>', methods=['GET'])
 @cross_origin()
+@read_only
+@response_cache.cached('skill_gaps:{user_id}')
 def analyze_skill_gaps(user_id):
     try:
         current_user = require_auth()
         if not current_user or current_user.id != user_id:
             return jsonify({'detail': 'Authentication required'}), 401
             
-        user = User.query.get_or_404(user_id)
-        
-        # Get current skill gaps
-        current_gaps = SkillGap.query.filter_by(user_id=user_id).order_by(
-            desc(SkillGap.priority_score)
-        ).all()
-        
         return jsonify({
-            'skill_gaps': [gap.to_dict() for gap in current_gaps]
+            'skill_gaps': user_skill_gaps(user_id)
         }), 200
         
     except Exception as e:
-        return jsonify({'detail': f'Skill gap analysis failed: {str(e)}'}), 500
\ No newline at end of file
+        return jsonify({'detail': f'Skill gap analysis failed: {str(e)}'}), 500
+
+# Dashboard Routes
+@main.route('/dashboard/<int:user_id>', methods=['GET'])
+@cross_origin()
+def get_dashboard(user_id):
+    """Every dashboard section in one round trip, loaded concurrently"""
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        try:
+            names, fields = dashboard.parse_selection(request.args)
+        except ValueError as e:
+            return jsonify({'detail': str(e)}), 400
+
+        if request.args.get('stream', 'false').lower() == 'true':
+            # One NDJSON line per section as it finishes, slow AI sections included
+            def generate():
+                for name, value, error in dashboard.iter_completed(user_id, names, fields):
+                    line = {'section': name, 'detail': error} if error else {'section': name, 'data': value}
+                    yield json.dumps(line) + '\n'
+                yield json.dumps({'done': True}) + '\n'
+
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        # Slow sections are handed to the task queue instead of holding up the response
+        fast = [name for name in names if name not in dashboard.deferred]
+        payload = dashboard.collect(user_id, fast, fields)
+        if 'pricing' in names:
+            stored = stored_pricing(user_id, earnings_summary(user_id))
+            if stored is not None:
+                payload['pricing'] = select_fields(stored, fields.get('pricing'))
+            else:
+                task = task_queue.enqueue('pricing_suggestions', {'user_id': user_id}, user_id=user_id,
+                                          dedupe_key=f'pricing:{user_id}')
+                payload['pricing'] = {'task_id': task.id, 'status_url': f'/api/tasks/{task.id}'}
+
+        return jsonify(payload), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Dashboard failed: {str(e)}'}), 500
+
+# Export Routes
+@main.route('/export/<int:user_id>/<resource>', methods=['GET'])
+@cross_origin()
+def export_data(user_id, resource):
+    """Stream projects, time logs or proposals as CSV or NDJSON"""
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        if resource not in data_exporter.resources():
+            return jsonify({'detail': f'Unknown export resource: {resource}'}), 404
+
+        fmt = request.args.get('format', 'csv').lower()
+        if fmt not in DataExporter.FORMATS:
+            return jsonify({'detail': 'format must be csv or ndjson'}), 400
+
+        try:
+            start = _parse_date_arg('start')
+            end = _parse_date_arg('end')
+        except ValueError:
+            return jsonify({'detail': 'start and end must be YYYY-MM-DD dates'}), 400
+
+        rows = data_exporter.stream(resource, user_id, fmt, start=start, end=end)
+        mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+
+        return Response(
+            stream_with_context(rows),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={resource}.{fmt}'}
+        )
+
+    except Exception as e:
+        return jsonify({'detail': f'Export failed: {str(e)}'}), 500
+
+def _parse_date_arg(name):
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+# Client Communication Routes
+@task_queue.handler('compact_communication_thread')
+def compact_communication_thread_task(payload):
+    thread = CommunicationThread.query.get(payload['thread_id'])
+    if not thread:
+        raise ValueError(f"Thread {payload['thread_id']} not found")
+    return {'compacted': communication_service.compact(thread)}
+
+@main.route('/communications', methods=['POST'])
+@cross_origin()
+def create_communication():
+    """Suggest a reply to a client message and record the exchange"""
+    try:
+        data = request.get_json() or {}
+        user_id = data.get('user_id')
+        project_id = data.get('project_id')
+        message_type = data.get('message_type')
+        client_message = data.get('client_message')
+
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        if not message_type or not client_message:
+            return jsonify({'detail': 'message_type and client_message are required'}), 400
+
+        project = None
+        if project_id is not None:
+            project = Project.query.filter_by(id=project_id, user_id=user_id).first()
+            if not project:
+                return jsonify({'detail': 'Project not found'}), 404
+
+        communication = communication_service.respond(user_id, project, message_type, client_message)
+
+        # Summarizing older messages happens off the request path
+        thread = communication_service.get_thread(user_id, communication.project_id)
+        if communication_service.needs_compaction(thread):
+            task_queue.enqueue('compact_communication_thread', {'thread_id': thread.id}, user_id=user_id,
+                               dedupe_key=f'compact:{thread.id}')
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Response generated successfully',
+            'communication': communication.to_dict()
+        }), 201
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Communication failed: {str(e)}'}), 500
+
+@main.route('/communications/<int:user_id>', methods=['GET'])
+@cross_origin()
+def get_communications(user_id):
+    try:
+        current_user = require_auth()
+        if not current_user or current_user.id != user_id:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        project_id = request.args.get('project_id', type=int)
+        limit = min(request.args.get('limit', 50, type=int), 200)
+
+        communications = ClientCommunication.query.filter_by(
+            user_id=user_id, project_id=project_id
+        ).order_by(desc(ClientCommunication.id)).limit(limit).all()
+        thread = CommunicationThread.query.filter_by(user_id=user_id, project_id=project_id).first()
+
+        return jsonify({
+            'communications': [communication.to_dict() for communication in communications],
+            'summary': thread.summary if thread else None
+        }), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Failed to get communications: {str(e)}'}), 500
+
+@main.route('/communications/<int:communication_id>/response', methods=['PUT'])
+@cross_origin()
+def record_communication_response(communication_id):
+    """Store the reply the freelancer actually sent so later prompts reflect it"""
+    try:
+        current_user = require_auth()
+        if not current_user:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        communication = ClientCommunication.query.get_or_404(communication_id)
+        if communication.user_id != current_user.id:
+            return jsonify({'detail': 'Communication not found'}), 404
+
+        data = request.get_json() or {}
+        communication.user_response = data.get('user_response')
+        db.session.commit()
+
+        return jsonify({'communication': communication.to_dict()}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'detail': f'Failed to record response: {str(e)}'}), 500
+
+# Background Task Routes
+@main.route('/tasks/<int:task_id>', methods=['GET'])
+@cross_origin()
+def get_task(task_id):
+    try:
+        current_user = require_auth()
+        if not current_user:
+            return jsonify({'detail': 'Authentication required'}), 401
+
+        task = BackgroundTask.query.get_or_404(task_id)
+        if task.user_id != current_user.id:
+            return jsonify({'detail': 'Task not found'}), 404
+
+        return jsonify({'task': task.to_dict()}), 200
+
+    except Exception as e:
+        return jsonify({'detail': f'Failed to get task: {str(e)}'}), 500
@@ -0,0 +1,38 @@
+from typing import Iterable, List, Set
+
+from __init__ import db
+from models import JobOpportunity, Skill, job_skills, normalize_skill
+
+
+def split_skills(skills_text: str) -> List[str]:
+    """Normalized skills from a comma-separated column, without blanks"""
+    if not skills_text:
+        return []
+    return [normalize_skill(skill) for skill in skills_text.split(',') if skill.strip()]
+
+
+class SkillJobIndex:
+    """Active canonical jobs by required skill, answered from the job_skills link table
+
+    set_skills and bulk ingest keep job_skills in step with required_skills, so
+    reprocessed skills and deactivated jobs show up without a refresh.
+    """
+
+    def jobs_for(self, skills: Iterable[str]) -> Set[int]:
+        """Ids of jobs requiring any of the given skills"""
+        slugs = {normalize_skill(skill)[:100] for skill in skills if skill.strip()}
+        if not slugs:
+            return set()
+        rows = db.session.query(job_skills.c.job_id).join(
+            Skill, Skill.id == job_skills.c.skill_id
+        ).join(
+            JobOpportunity, JobOpportunity.id == job_skills.c.job_id
+        ).filter(
+            Skill.slug.in_(slugs),
+            JobOpportunity.is_active == True,
+            JobOpportunity.canonical_job_id.is_(None)
+        ).distinct()
+        return {job_id for job_id, in rows}
+
+
+skill_job_index = SkillJobIndex()
@@ -0,0 +1,173 @@
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import JobOpportunity
+from response_cache import response_cache
+from skill_index import split_skills
+
+# Per-byte popcounts, used where numpy has no bitwise_count (numpy < 2.0)
+POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+IGNORED_SKILLS = {'general'}
+
+
+def popcount_rows(bits: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bits).sum(axis=1, dtype=np.int32)
+    return POPCOUNT_TABLE[bits.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+class CatalogueSnapshot:
+    """Structure-of-arrays view of the active job catalogue"""
+
+    def __init__(self, vocabulary: Dict[str, int], job_ids: np.ndarray, bits: np.ndarray,
+                 skill_counts: np.ndarray, budgets: np.ndarray, source_codes: np.ndarray,
+                 sources: Dict[str, int], stamp):
+        self.vocabulary = vocabulary
+        self.job_ids = job_ids
+        self.bits = bits
+        self.skill_counts = skill_counts
+        self.budgets = budgets
+        self.source_codes = source_codes
+        self.sources = sources
+        self.stamp = stamp
+
+    def user_bits(self, skills: List[str]) -> np.ndarray:
+        words = np.zeros(self.bits.shape[1], dtype=np.uint64)
+        for skill in skills:
+            skill_id = self.vocabulary.get(skill)
+            if skill_id is not None:
+                words[skill_id // 64] |= np.uint64(1) << np.uint64(skill_id % 64)
+        return words
+
+
+class SkillBitsetMatcher:
+    """Rank the whole catalogue for one user with vectorized popcounts over skill bitsets"""
+
+    def __init__(self, refresh_seconds: Optional[float] = None):
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else float(
+            os.getenv('SKILL_MATCHER_REFRESH_SECONDS', '60')
+        )
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> CatalogueSnapshot:
+        """Current snapshot, rebuilt when jobs have changed and the refresh interval has passed"""
+        stamp = response_cache.stamps(['jobs'])
+        current = self._snapshot
+        if current is not None and (
+            current.stamp == stamp or time.monotonic() - self._built_at < self.refresh_seconds
+        ):
+            return current
+
+        with self._lock:
+            if self._snapshot is current:
+                self._snapshot = self.build(stamp)
+                self._built_at = time.monotonic()
+            return self._snapshot
+
+    def build(self, stamp=None) -> CatalogueSnapshot:
+        vocabulary: Dict[str, int] = {}
+        sources: Dict[str, int] = {}
+        job_ids, job_skill_ids, budgets, source_codes = [], [], [], []
+
+        rows = JobOpportunity.query.with_entities(
+            JobOpportunity.id, JobOpportunity.required_skills,
+            JobOpportunity.budget, JobOpportunity.source
+        ).filter(
+            JobOpportunity.is_active == True,
+            JobOpportunity.canonical_job_id.is_(None)
+        ).yield_per(5000)
+
+        for job_id, required_skills, budget, source in rows:
+            skill_ids = {
+                vocabulary.setdefault(skill, len(vocabulary))
+                for skill in split_skills(required_skills) if skill not in IGNORED_SKILLS
+            }
+            job_ids.append(job_id)
+            job_skill_ids.append(skill_ids)
+            budgets.append(budget if budget is not None else np.nan)
+            source_codes.append(sources.setdefault(source, len(sources)))
+
+        words = max(1, (len(vocabulary) + 63) // 64)
+        bits = np.zeros((len(job_ids), words), dtype=np.uint64)
+        skill_counts = np.zeros(len(job_ids), dtype=np.int16)
+
+        # Set every (job, skill) bit in one scatter
+        rows_index = np.fromiter(
+            (row for row, skill_ids in enumerate(job_skill_ids) for _ in skill_ids), dtype=np.int64
+        )
+        skill_index = np.fromiter(
+            (skill_id for skill_ids in job_skill_ids for skill_id in skill_ids), dtype=np.int64
+        )
+        if len(skill_index):
+            np.bitwise_or.at(
+                bits,
+                (rows_index, skill_index // 64),
+                np.left_shift(np.uint64(1), (skill_index % 64).astype(np.uint64))
+            )
+            skill_counts = np.bincount(rows_index, minlength=len(job_ids)).astype(np.int16)
+
+        return CatalogueSnapshot(
+            vocabulary=vocabulary,
+            job_ids=np.array(job_ids, dtype=np.int64),
+            # Column-major, so gathering a user's few words reads contiguous memory
+            bits=np.asfortranarray(bits),
+            skill_counts=skill_counts,
+            budgets=np.array(budgets, dtype=np.float32),
+            source_codes=np.array(source_codes, dtype=np.int16),
+            sources=sources,
+            stamp=stamp
+        )
+
+    def match(self, user_skills: List[str], limit: int = 20, min_budget: Optional[float] = None,
+              source: Optional[str] = None, min_overlap: int = 1) -> List[Dict]:
+        """Top jobs by share of required skills the user has, ties broken by raw overlap"""
+        snapshot = self.snapshot()
+        if not len(snapshot.job_ids):
+            return []
+
+        normalized = [skill for skill in split_skills(','.join(user_skills)) if skill not in IGNORED_SKILLS]
+        user_bits = snapshot.user_bits(normalized)
+        # A user holds a handful of skills, so only the words they touch need ANDing
+        columns = np.flatnonzero(user_bits)
+        if len(columns):
+            job_words = np.ascontiguousarray(snapshot.bits[:, columns])
+            overlap = popcount_rows(job_words & user_bits[columns])
+        else:
+            overlap = np.zeros(len(snapshot.job_ids), dtype=np.int32)
+
+        mask = overlap >= min_overlap
+        if min_budget is not None:
+            mask &= snapshot.budgets >= min_budget
+        if source is not None:
+            code = snapshot.sources.get(source)
+            if code is None:
+                return []
+            mask &= snapshot.source_codes == code
+
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        coverage = overlap[candidates] / np.maximum(snapshot.skill_counts[candidates], 1)
+        # Coverage dominates; overlap only separates equal coverage
+        ranking = coverage * 1000 + overlap[candidates]
+        top = min(limit, len(candidates))
+        best = np.argpartition(-ranking, top - 1)[:top]
+        best = best[np.argsort(-ranking[best], kind='stable')]
+
+        return [{
+            'job_id': int(snapshot.job_ids[candidates[position]]),
+            'skill_overlap': int(overlap[candidates[position]]),
+            'skill_coverage': round(float(coverage[position]) * 100, 1)
+        } for position in best]
+
+
+skill_matcher = SkillBitsetMatcher()
@@ -0,0 +1,48 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import insert, select
+
+from __init__ import db
+from models import JobOpportunity, Skill, User, job_skills, normalize_skill, parse_skills, user_skills
+
+
+def backfill(model, text_column, link_table, owner_column, batch_size=1000):
+    """Link rows to the skills table from their comma-separated column; returns rows linked"""
+    linked_ids = select(owner_column)
+    linked = 0
+    last_id = 0
+
+    while True:
+        rows = db.session.query(model.id, text_column).filter(
+            model.id > last_id,
+            ~model.id.in_(linked_ids)
+        ).order_by(model.id).limit(batch_size).all()
+        if not rows:
+            return linked
+
+        skills_by_row = {row_id: parse_skills(text) for row_id, text in rows}
+        names = [name for skills in skills_by_row.values() for name in skills]
+        skill_ids = {skill.slug: skill.id for skill in Skill.get_or_create_many(names)}
+
+        links = [
+            {owner_column.name: row_id, 'skill_id': skill_ids[normalize_skill(name)[:100]]}
+            for row_id, skills in skills_by_row.items()
+            for name in skills
+        ]
+        if links:
+            db.session.execute(insert(link_table), links)
+        db.session.commit()
+
+        linked += len({link[owner_column.name] for link in links})
+        last_id = rows[-1][0]
+
+
+@click.command('backfill-skills')
+@click.option('--batch-size', default=1000, show_default=True)
+@with_appcontext
+def backfill_skills(batch_size):
+    """Fill skills, user_skills and job_skills from the old comma-separated columns"""
+    db.create_all()
+    users = backfill(User, User.skills, user_skills, user_skills.c.user_id, batch_size)
+    jobs = backfill(JobOpportunity, JobOpportunity.required_skills, job_skills, job_skills.c.job_id, batch_size)
+    click.echo(f"✅ Linked skills for {users} users and {jobs} jobs")
@@ -0,0 +1,74 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+
+class SnapshotStore:
+    """Gzip-compressed, content-addressed store of raw scraper payloads with an append-only manifest"""
+
+    def __init__(self, root: str = None):
+        self.root = root or os.getenv(
+            'SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+        )
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, 'manifest.jsonl')
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.root, 'objects', digest[:2], f'{digest[2:]}.gz')
+
+    def put(self, source: str, url: str, payload: bytes, fetched_at: Optional[datetime] = None) -> str:
+        """Store a payload once per distinct content and record this fetch in the manifest"""
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self.path_for(digest)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so readers never see a partial object
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, 'wb') as tmp:
+                # mtime=0 keeps the compressed bytes reproducible
+                with gzip.GzipFile(fileobj=tmp, mode='wb', mtime=0) as compressed:
+                    compressed.write(payload)
+            os.replace(tmp_path, path)
+
+        entry = {
+            'digest': digest,
+            'source': source,
+            'url': url,
+            'size': len(payload),
+            'fetched_at': (fetched_at or datetime.utcnow()).isoformat()
+        }
+        with self._lock:
+            with open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+                manifest.write(json.dumps(entry) + '\n')
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        with gzip.open(self.path_for(digest), 'rb') as compressed:
+            return compressed.read()
+
+    def entries(self, source: Optional[str] = None, since: Optional[datetime] = None) -> Iterator[Dict]:
+        """Manifest entries, oldest first"""
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, encoding='utf-8') as manifest:
+            for line in manifest:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if source and entry['source'] != source:
+                    continue
+                if since and datetime.fromisoformat(entry['fetched_at']) < since:
+                    continue
+                yield entry
+
+
+snapshot_store = SnapshotStore()
@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from __init__ import db
+from models import BackgroundTask
+
+
+class TaskQueue:
+    """Database-backed task queue worked by background threads"""
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable] = {}
+        self.app = None
+        self.workers = []
+        self.poll_interval = 1.0
+        self.lease_seconds = 600
+        self.retry_backoff = 30
+        self.retention_days = 7
+        self._last_maintenance = 0.0
+        self._started = False
+        self._start_lock = threading.Lock()
+        self.periodic_tasks: Dict[str, int] = {}
+
+    def init_app(self, app):
+        self.app = app
+        self.poll_interval = float(os.getenv('TASK_POLL_INTERVAL', '1.0'))
+        self.lease_seconds = int(os.getenv('TASK_LEASE_SECONDS', '600'))
+        self.retry_backoff = int(os.getenv('TASK_RETRY_BACKOFF', '30'))
+        self.retention_days = int(os.getenv('TASK_RETENTION_DAYS', '7'))
+
+        # Workers start with the first request, so CLI commands never run background tasks
+        app.before_request(self.start)
+
+    def start(self):
+        """Start the worker threads once per process (TASK_WORKERS=0 disables them)"""
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+            for index in range(int(os.getenv('TASK_WORKERS', '2'))):
+                worker = threading.Thread(target=self._work, name=f'task-worker-{index}', daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def handler(self, task_type: str):
+        """Register a function that runs tasks of this type; it receives the task payload"""
+        def decorator(func):
+            self.handlers[task_type] = func
+            return func
+        return decorator
+
+    def periodic(self, task_type: str, interval_seconds: int):
+        """Keep one task of this type scheduled, interval_seconds after the previous run"""
+        self.periodic_tasks[task_type] = interval_seconds
+
+    def enqueue(self, task_type: str, payload: Dict, user_id: Optional[int] = None,
+                max_attempts: int = 3, run_after: Optional[datetime] = None,
+                dedupe_key: Optional[str] = None) -> Optional[BackgroundTask]:
+        """Persist a task so a worker picks it up, even after a restart
+
+        With a dedupe_key, returns the pending task already holding that key instead of
+        adding another (None only if that task keeps finishing while we look it up).
+        """
+        if task_type not in self.handlers:
+            raise ValueError(f'No handler registered for task type: {task_type}')
+
+        for _ in range(2):
+            task = BackgroundTask(
+                task_type=task_type,
+                user_id=user_id,
+                payload=json.dumps(payload),
+                max_attempts=max_attempts,
+                run_after=run_after or datetime.utcnow(),
+                dedupe_key=dedupe_key
+            )
+            db.session.add(task)
+            try:
+                db.session.commit()
+                return task
+            except IntegrityError:
+                if dedupe_key is None:
+                    raise
+                db.session.rollback()
+
+            existing = BackgroundTask.query.filter_by(dedupe_key=dedupe_key).first()
+            if existing:
+                return existing
+            # The holder finished and released the key between our insert and lookup
+        return None
+
+    def _work(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    ran = self.run_next()
+            except Exception as e:
+                print(f"Task worker error: {e}")
+                ran = False
+
+            if not ran:
+                time.sleep(self.poll_interval)
+
+    def run_next(self) -> bool:
+        """Claim and run one due task; returns False when nothing was due"""
+        self._maintain()
+
+        now = datetime.utcnow()
+        candidate = BackgroundTask.query.filter(
+            BackgroundTask.status == 'queued',
+            BackgroundTask.run_after <= now
+        ).order_by(BackgroundTask.run_after, BackgroundTask.id).first()
+
+        if not candidate:
+            db.session.rollback()
+            return False
+
+        # Conditional update so only one worker (in any process) wins the claim
+        claimed = BackgroundTask.query.filter_by(id=candidate.id, status='queued').update({
+            'status': 'running',
+            'locked_at': now,
+            'attempts': BackgroundTask.attempts + 1
+        }, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return True
+
+        task = db.session.get(BackgroundTask, candidate.id)
+        db.session.refresh(task)
+        self._execute(task)
+        return True
+
+    def _execute(self, task: BackgroundTask):
+        handler = self.handlers.get(task.task_type)
+        try:
+            if handler is None:
+                raise ValueError(f'No handler registered for task type: {task.task_type}')
+
+            result = handler(task.get_payload())
+            task.status = 'succeeded'
+            task.result = json.dumps(result, default=str)
+            task.error = None
+            task.locked_at = None
+            task.dedupe_key = None
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            task = db.session.get(BackgroundTask, task.id)
+            task.error = str(e)
+            task.locked_at = None
+            if task.attempts < task.max_attempts:
+                task.status = 'queued'
+                task.run_after = datetime.utcnow() + timedelta(
+                    seconds=self.retry_backoff * (2 ** (task.attempts - 1))
+                )
+            else:
+                task.status = 'failed'
+                task.dedupe_key = None
+            db.session.commit()
+
+    def _maintain(self):
+        if time.monotonic() - self._last_maintenance < self.poll_interval * 30:
+            return
+        self._last_maintenance = time.monotonic()
+
+        self._requeue_expired_leases()
+        self._purge_finished()
+        self._schedule_periodic()
+
+    def _requeue_expired_leases(self):
+        """Put back tasks whose worker died mid-run, e.g. because the server restarted"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        expired = BackgroundTask.query.filter(
+            BackgroundTask.status == 'running',
+            BackgroundTask.locked_at < cutoff
+        )
+        requeued = expired.filter(BackgroundTask.attempts < BackgroundTask.max_attempts).update(
+            {'status': 'queued', 'locked_at': None}, synchronize_session=False
+        )
+        failed = expired.filter(BackgroundTask.attempts >= BackgroundTask.max_attempts).update(
+            {'status': 'failed', 'locked_at': None, 'error': 'Worker lease expired', 'dedupe_key': None},
+            synchronize_session=False
+        )
+        if requeued or failed:
+            db.session.commit()
+
+    def _purge_finished(self):
+        """Delete succeeded and failed tasks once nobody is likely to poll them any more"""
+        cutoff = datetime.utcnow() - timedelta(days=self.retention_days)
+        purged = BackgroundTask.query.filter(
+            BackgroundTask.status.in_(('succeeded', 'failed')),
+            BackgroundTask.updated_at < cutoff
+        ).delete(synchronize_session=False)
+        if purged:
+            db.session.commit()
+
+    def _schedule_periodic(self):
+        for task_type, interval in self.periodic_tasks.items():
+            pending = BackgroundTask.query.filter(
+                BackgroundTask.task_type == task_type,
+                BackgroundTask.status.in_(('queued', 'running'))
+            ).first()
+            if pending:
+                continue
+
+            last_run = BackgroundTask.query.filter_by(task_type=task_type).order_by(
+                BackgroundTask.updated_at.desc()
+            ).first()
+            run_after = last_run.updated_at + timedelta(seconds=interval) if last_run else datetime.utcnow()
+            # The unique key makes a concurrent scheduler's insert fail instead of doubling up
+            self.enqueue(task_type, {}, max_attempts=1, run_after=run_after,
+                         dedupe_key=f'periodic:{task_type}')
+
+
+task_queue = TaskQueue()
@@ -17,17 +17,24 @@ function Dashboard({ user, onLogout }) {
   const loadDashboardData = async () => {
     try {
       setLoading(true)
-      const [analyticsRes, jobsRes, projectsRes, skillGapsRes] = await Promise.all([
-        ApiService.getAnalytics(user.id),
-        ApiService.getJobs(user.id),
-        ApiService.getUserProjects(user.id),
-        ApiService.getSkillGaps(user.id)
-      ])
-
-      setAnalytics(analyticsRes)
-      setJobs(jobsRes.jobs || [])
-      setProjects(projectsRes.projects || [])
-      setSkillGaps(skillGapsRes.skill_gaps || [])
+      await ApiService.streamDashboard(user.id, (section, data, detail) => {
+        if (detail) {
+          console.error(detail)
+          return
+        }
+        if (section === 'analytics') {
+          setAnalytics(prev => ({ ...prev, summary: data }))
+          setLoading(false)
+        } else if (section === 'pricing') {
+          setAnalytics(prev => ({ ...prev, pricing_suggestion: data }))
+        } else if (section === 'jobs') {
+          setJobs(data || [])
+        } else if (section === 'projects') {
+          setProjects(data || [])
+        } else if (section === 'skill_gaps') {
+          setSkillGaps(data || [])
+        }
+      })
     } catch (error) {
       console.error('Failed to load dashboard data:', error)
     } finally {
@@ -118,7 +125,7 @@ function Dashboard({ user, onLogout }) {
         </div>
 
         {/* Tab Content */}
-        {activeTab === 'overview' && analytics && (
+        {activeTab === 'overview' && analytics?.summary && (
           <div className="space-y-6">
             {/* Stats Cards */}
             <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
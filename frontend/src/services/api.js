@@ -37,7 +37,7 @@ class ApiService {
     }
 
     const data = await response.json();
-    // Store the user data in localStorage (the token is just for frontend compatibility)
+    // Store the signed access token and user data in localStorage
     if (data.access_token && data.user) {
       localStorage.setItem('token', data.access_token);
       localStorage.setItem('user', JSON.stringify(data.user));
@@ -73,10 +73,16 @@ class ApiService {
     return !!this.getAuthToken() && !!this.getCurrentUser();
   }
 
+  static authHeaders() {
+    const token = this.getAuthToken();
+    return token ? { Authorization: `Bearer ${token}` } : {};
+  }
+
   // Helper method to make authenticated requests
   static async authenticatedRequest(url, options = {}) {
     const headers = {
       'Content-Type': 'application/json',
+      ...this.authHeaders(),
       ...options.headers,
     };
 
@@ -102,6 +108,41 @@ class ApiService {
   }
 
   // Dashboard endpoints
+  // Streams one NDJSON line per section so fast sections render before the AI pricing
+  static async streamDashboard(userId, onSection) {
+    const response = await fetch(`${API_BASE_URL}/dashboard/${userId}?stream=true`, {
+      headers: { 'Content-Type': 'application/json', ...this.authHeaders() },
+      credentials: 'include',
+    });
+
+    if (response.status === 401) {
+      this.logout();
+      window.location.href = '/login';
+      throw new Error('Authentication required');
+    }
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Request failed');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      for (const line of lines) {
+        if (!line.trim()) continue;
+        const message = JSON.parse(line);
+        if (message.section) onSection(message.section, message.data, message.detail);
+      }
+    }
+  }
+
   static async getAnalytics(userId) {
     return this.authenticatedRequest(`/analytics/${userId}`);
   }